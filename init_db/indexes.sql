@@ -0,0 +1,23 @@
+-- Applied by init_db.py after the bulk COPYs: building indexes and checking
+-- foreign keys once over the loaded data is much cheaper than per inserted row.
+-- Foreign keys are added NOT VALID, then validated in a single pass.
+ALTER TABLE client_tag
+  ADD CONSTRAINT client_tag_tag_id_fkey FOREIGN KEY (tag_id) REFERENCES tag_config (id) NOT VALID;
+ALTER TABLE client_tag VALIDATE CONSTRAINT client_tag_tag_id_fkey;
+
+ALTER TABLE auto_tag_statistic
+  ADD CONSTRAINT auto_tag_statistic_tag_id_fkey FOREIGN KEY (tag_id) REFERENCES tag_config (id) NOT VALID;
+ALTER TABLE auto_tag_statistic VALIDATE CONSTRAINT auto_tag_statistic_tag_id_fkey;
+
+-- Join/filter paths of the app's read queries (tailored_offers.py):
+-- per-client tag lookups and keyset pages on (client_id, tag_id) use the client_tag primary key;
+-- client lookups use the client primary key, so neither needs an extra index
+-- client_tag -> tag_config joins and per-tag counts, covering the selected columns
+CREATE INDEX IF NOT EXISTS idx_client_tag_tag_id
+  ON client_tag (tag_id) INCLUDE (client_id, ont_id, assigned_at, assigned_by, reason);
+-- auto tag history per tag over time
+CREATE INDEX IF NOT EXISTS idx_ats_tag_date ON auto_tag_statistic (tag_id, run_finished_at);
+-- last run day (MAX(run_finished_at) and the range scan for that day)
+CREATE INDEX IF NOT EXISTS idx_ats_run_finished_at ON auto_tag_statistic (run_finished_at);
+-- manual tag lookups (tag_type = 'M')
+CREATE INDEX IF NOT EXISTS idx_tag_config_manual ON tag_config (id) WHERE tag_type = 'M';
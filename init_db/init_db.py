@@ -1,40 +1,187 @@
 #!/usr/bin/env python3
 """
 init_db.py
-- Drops existing tables (auto_tag_statistic, client_tag, tag_config, client)
-- Recreates schema from schema.sql
-- Loads CSV data from ./data/:
+- Drops existing tables (auto_tag_statistic, client_tag, tag_config, client),
+  children before parents (TableSpec.parents, see build_order)
+- Recreates schema from schema.sql (tables + primary keys only)
+- Loads CSV data from ./data/, parents before children (see build_order):
   * tag_config.csv (includes 'id')  [required]
   * client.csv                      [optional]
   * client_tag.csv                  [required]
   * auto_tag_statistic.csv          [required]
 - Resets the identity sequence on tag_config.id after import
+- Applies indexes.sql (foreign keys, secondary indexes) once all data is loaded
+- VACUUM (ANALYZE)s the loaded tables so the planner has statistics right away
+
+Usage: python init_db.py [--fast-reseed] [--unlogged] [--server-data-dir DIR] [--server-reads-data-dir]
+  --fast-reseed  if the tables were created from the current schema.sql (hash kept
+                 in _init_meta), TRUNCATE ... RESTART IDENTITY them instead of
+                 dropping and recreating; falls back to a full rebuild otherwise
+  --unlogged     load client_tag / auto_tag_statistic as UNLOGGED tables and leave them
+                 so: no WAL for the bulk rows, but the tables are emptied after a crash
+                 and not replicated; for throwaway databases only. (Switching them back
+                 to LOGGED would write the whole table to WAL, so the default loads
+                 them LOGGED in the first place.)
+  --server-data-dir DIR
+                 load the required CSVs from zstd-compressed copies already staged
+                 on the database host, via COPY ... FROM PROGRAM 'zstd -dc ...'
+                 (needs pg_execute_server_program). Stage them with e.g.:
+                   zstd -19 data/tag_config.csv data/client_tag.csv data/auto_tag_statistic.csv
+                   scp data/*.csv.zst dbhost:/tmp/
+                 Only compressed bytes cross the network; for a remote database.
+  --server-reads-data-dir
+                 the database server sees ./data at the same path (e.g. a server on this
+                 machine reached over TCP, not in a container): it reads the CSVs itself with
+                 COPY ... FROM '<path>' (needs pg_read_server_files). Implied when connected
+                 over a Unix socket.
+
+The connection URL comes from the DATABASE_URL environment variable, or else
+from [database].url in db_url.toml.
+
+CSVs are parsed client-side, one batch at a time with pyarrow's streaming CSV reader,
+and the typed rows streamed with COPY ... (FORMAT BINARY), so the backend never has to
+tokenize CSV text or convert text tokens to typed values.
 """
 
+import argparse
+import contextlib
+import hashlib
+import os
 import sys
 import pathlib
+import shlex
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, tzinfo
+from typing import AnyStr, Iterator
 import psycopg
+from psycopg_pool import ConnectionPool
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+from psycopg import sql
 import tomllib  # Python 3.11+. For Python 3.10: pip install tomli && `import tomli as tomllib`
 
 ROOT = pathlib.Path(__file__).resolve().parent
 DATA_DIR = ROOT / "data"
 SCHEMA_PATH = ROOT / "schema.sql"
+INDEXES_PATH = ROOT / "indexes.sql"
 CONFIG_PATH = ROOT / "db_url.toml"
 
 TAG_CONFIG_CSV    = DATA_DIR / "tag_config.csv"          # includes 'id'
 CLIENT_CSV        = DATA_DIR / "client.csv"              # optional
 CLIENT_TAG_CSV    = DATA_DIR / "client_tag.csv"          # required
 AUTO_TAG_STAT_CSV = DATA_DIR / "auto_tag_statistic.csv"  # required
+MAX_PARALLEL_COPIES = 2      # one connection per table; keep well below the server's slots
+
+# Bulk-load settings for this script's own sessions (other clients are unaffected):
+# no WAL flush wait per COMMIT, room for the post-load index/FK builds and the sorts/hashes
+# behind them. Applied right after connecting (apply_session_settings).
+SESSION_SETTINGS = {
+    "synchronous_commit": "off",
+    "maintenance_work_mem": "1GB",
+    "work_mem": "256MB",
+}
+
+@dataclass(frozen=True)
+class TableSpec:
+    """How one table is loaded from its CSV."""
+    table: str
+    cols: str           # CSV/table columns, as in the COPY column list
+    types: list[str]    # PostgreSQL type per column (binary COPY)
+    path: pathlib.Path
+    required: bool = True
+    hint: str = ""      # likely cause, shown when the load fails
+    tag_id_col: str | None = None  # column whose values must be ids from tag_config.csv
+    parents: tuple[str, ...] = ()  # tables referenced by this one's foreign keys (indexes.sql)
 
-# Drop children -> parents (no FKs to client, but keep order tidy)
-DROP_SQL = """
-DROP TABLE IF EXISTS auto_tag_statistic;
-DROP TABLE IF EXISTS client_tag;
-DROP TABLE IF EXISTS tag_config;
-DROP TABLE IF EXISTS client;
+# Tables loaded by this script, by name. Drop and load order are not listed here:
+# build_order derives them from the parents of each spec. The foreign keys themselves
+# are only created by indexes.sql after the load, so the catalog cannot be asked.
+TABLE_SPECS = {spec.table: spec for spec in (
+    TableSpec(
+        "tag_config",
+        "id, system_name, display_name, tag_type, color, description, is_active, created_at, updated_at",
+        ["int4", "text", "text", "text", "text", "text", "bool", "timestamptz", "timestamptz"],
+        TAG_CONFIG_CSV,
+        hint="ids must be unique and tag_type a single character",
+    ),
+    TableSpec(
+        "client",
+        "client_id, ont_id, name, phone, service_id, city, area, address, type, sip",
+        ["int4", "text", "text", "text", "text", "text", "text", "text", "text", "text"],
+        CLIENT_CSV,
+        required=False,
+        hint="client_id must be unique and ont_id set on every row",
+    ),
+    TableSpec(
+        "client_tag",
+        "client_id, ont_id, tag_id, assigned_at, assigned_by, reason",
+        ["int4", "text", "int4", "timestamptz", "text", "text"],
+        CLIENT_TAG_CSV,
+        tag_id_col="tag_id",
+        parents=("tag_config",),
+        hint="each (client_id, tag_id) pair may appear only once",
+    ),
+    TableSpec(
+        "auto_tag_statistic",
+        "tag_id, assigned_count, run_started_at, run_finished_at",
+        ["int4", "int4", "timestamptz", "timestamptz"],
+        AUTO_TAG_STAT_CSV,
+        tag_id_col="tag_id",
+        parents=("tag_config",),
+        hint="assigned_count and both run timestamps are required on every row",
+    ),
+)}
+
+# With --unlogged, client_tag and auto_tag_statistic are COPYed as UNLOGGED tables (no WAL)
+# and stay that way. SET LOGGED makes them crash-safe again, but writes the whole table to
+# WAL, so it is only used to undo --unlogged (on empty tables, or after a failed load).
+UNLOGGED_SQL = """
+ALTER TABLE client_tag SET UNLOGGED;
+ALTER TABLE auto_tag_statistic SET UNLOGGED;
+"""
+LOGGED_SQL = """
+ALTER TABLE client_tag SET LOGGED;
+ALTER TABLE auto_tag_statistic SET LOGGED;
 """
 
+TRUNCATE_SQL = f"TRUNCATE {', '.join(TABLE_SPECS)} RESTART IDENTITY CASCADE"
+
+# tag_config.id identity from the loaded ids (empty table: next id is 1). Parameterless, so
+# it is sent together with indexes.sql as one simple query: no round-trip of its own.
+SETVAL_SQL = b"""
+SELECT setval(pg_get_serial_sequence('tag_config', 'id'), COALESCE(MAX(id), 1), MAX(id) IS NOT NULL)
+FROM tag_config;
+"""
+
+# Objects created by indexes.sql; dropped before a --fast-reseed load so it is not
+# checked/maintained per row (a full rebuild drops them along with the tables).
+# Read from the catalog rather than listed here, so new ones in indexes.sql are covered:
+# every foreign key of the tables, then every index that backs no constraint (schema.sql
+# only creates primary keys). Foreign keys go first, before the indexes they may use.
+POST_LOAD_DROPS_SQL = """
+    SELECT 1 AS step, format('ALTER TABLE %%s DROP CONSTRAINT %%I', conrelid::regclass, conname)
+    FROM pg_constraint
+    WHERE contype = 'f' AND conrelid = ANY(%(tables)s::regclass[])
+    UNION ALL
+    SELECT 2, format('DROP INDEX %%s', i.indexrelid::regclass)
+    FROM pg_index i
+    WHERE i.indrelid = ANY(%(tables)s::regclass[])
+      AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+    ORDER BY step
+"""
+
+def split_sql(script: AnyStr) -> list[AnyStr]:
+    """Split a plain DDL script on ';' (pipeline mode sends one statement per query)."""
+    sep = b";" if isinstance(script, bytes) else ";"
+    return [stmt.strip() for stmt in script.split(sep) if stmt.strip()]
+
 def load_db_url() -> str:
+    """DATABASE_URL from the environment if set (CI, containers), else [database].url in db_url.toml."""
+    return os.environ.get("DATABASE_URL") or _load_toml_url()
+
+def _load_toml_url() -> str:
     with CONFIG_PATH.open("rb") as f:
         cfg = tomllib.load(f)
     try:
@@ -42,90 +189,445 @@ def load_db_url() -> str:
     except KeyError as e:
         raise SystemExit("❌ Missing [database].url in db_url.toml") from e
 
-def copy_file(cur, table: str, cols_csv: str, path: pathlib.Path) -> None:
+def parse_timestamp(value: str, tz: tzinfo) -> datetime:
+    try:
+        ts = datetime.fromisoformat(value)
+    except ValueError:
+        ts = datetime.strptime(value, "%m/%d/%Y")  # PostgreSQL DateStyle MDY, as in tag_config.csv
+    # Values without an offset are in the session TimeZone, like a CSV COPY would read them
+    return ts if ts.tzinfo else ts.replace(tzinfo=tz)
+
+# Arrow type each CSV column is parsed to. timestamptz columns are read as strings and
+# converted by timestamptz_column (their format differs per file).
+ARROW_TYPES = {
+    "int4": pa.int32(),
+    "bool": pa.bool_(),
+    "text": pa.string(),  # also used for CHAR(n): same binary wire format
+    "timestamptz": pa.string(),
+}
+CSV_CONVERT = dict(
+    null_values=[""],  # empty fields load as NULL
+    strings_can_be_null=True,
+    quoted_strings_can_be_null=False,  # ...but a quoted "" is an empty string, as with COPY ... CSV
+    true_values=["t", "true", "TRUE", "True", "y", "yes", "on", "1"],
+    false_values=["f", "false", "FALSE", "False", "n", "no", "off", "0"],
+)
+
+def timestamptz_column(values: pa.Array, tz: tzinfo) -> pa.Array | list:
+    """Convert a column of timestamp strings to aware timestamps, vectorized where possible."""
+    try:
+        return values.cast(pa.timestamp("us", tz="UTC"))  # ISO 8601, every value with an offset
+    except pa.ArrowInvalid:
+        pass
+    tz_name = getattr(tz, "key", None)
+    if tz_name:
+        # No offsets at all: parse naive, then place in the session TimeZone
+        for parse in (
+            lambda: values.cast(pa.timestamp("us")),
+            lambda: pc.strptime(values, format="%m/%d/%Y", unit="us"),  # DateStyle MDY, as in tag_config.csv
+        ):
+            try:
+                return pc.assume_timezone(parse(), tz_name)
+            except pa.ArrowInvalid:
+                pass
+    # Mixed formats: value by value
+    return [None if v is None else parse_timestamp(v, tz) for v in values.to_pylist()]
+
+def check_tag_ids(values: pa.Array, column: str, tag_ids: pa.ChunkedArray, first_row: int = 0) -> None:
+    """Raise ValueError if the column holds ids missing from tag_config.csv (vectorized set lookup).
+
+    `first_row` is the 0-based data row of values[0], for the CSV line numbers in the message.
+    """
+    unknown = pc.and_(pc.invert(pc.is_in(values, value_set=tag_ids)), pc.is_valid(values))
+    if pc.any(unknown).as_py():
+        rows = pc.indices_nonzero(unknown).to_pylist()
+        bad = sorted(set(values.take(rows).to_pylist()))
+        lines = ", ".join(str(first_row + i + 2) for i in rows[:10]) + (", …" if len(rows) > 10 else "")  # +1 header, 1-based
+        raise ValueError(f"{column} not in tag_config.csv: {', '.join(map(str, bad))} (CSV lines {lines})")
+
+def iter_csv_batches(source, names: list[str], types: list[str]) -> pacsv.CSVStreamingReader:
+    """Stream a CSV as typed Arrow record batches; only one batch is held in memory at a time.
+
+    Reads from the start of `source`, which may already have been read (e.g. for the tag_id check).
+    """
+    source.seek(0)
+    return pacsv.open_csv(source, convert_options=pacsv.ConvertOptions(
+        column_types={name: ARROW_TYPES[t] for name, t in zip(names, types)},
+        include_columns=names,
+        **CSV_CONVERT,
+    ))
+
+def read_csv_rows(
+    source,
+    cols_csv: str,
+    types: list[str],
+    tz: tzinfo,
+    tag_id_col: str | None = None,
+    tag_ids: pa.ChunkedArray | None = None,
+):
+    """Parse a CSV with Arrow's multithreaded reader and yield typed row tuples, batch by batch."""
+    names = [c.strip() for c in cols_csv.split(",")]
+    first_row = 0
+    for batch in iter_csv_batches(source, names, types):
+        if tag_id_col and tag_ids is not None:
+            check_tag_ids(batch.column(tag_id_col), tag_id_col, tag_ids, first_row)
+        columns = []
+        for name, t in zip(names, types):
+            column = batch.column(name)
+            if t == "timestamptz":
+                column = timestamptz_column(column, tz)
+            columns.append(column if isinstance(column, list) else column.to_pylist())
+        yield from zip(*columns)
+        first_row += batch.num_rows
+
+def copy_file(
+    cur,
+    table: str,
+    cols_csv: str,
+    types: list[str],
+    source: pa.MemoryMappedFile,
+    tag_id_col: str | None = None,
+    tag_ids: pa.ChunkedArray | None = None,
+) -> None:
+    """COPY a CSV (with header), already opened by open_csv_sources, into table using the binary protocol.
+
+    `types` lists the PostgreSQL type of each column in `cols_csv`. Empty fields load as NULL.
+    If given, every `tag_id_col` value must be in `tag_ids`; checked batch by batch as it streams.
+    """
+    if source.size() == 0:
+        return  # nothing to load (Arrow rejects a file without a header)
+    # Rows are parsed one Arrow batch at a time while the COPY runs, so memory stays
+    # bounded; a bad value aborts the COPY and its transaction rolls the table back
     with cur.copy(f"""
         COPY {table}
         ({cols_csv})
-        FROM STDIN WITH (FORMAT CSV, HEADER TRUE, NULL '')
+        FROM STDIN WITH (FORMAT BINARY)
     """) as copy:
-        with path.open("rb") as f:
-            copy.write(f.read())
+        copy.set_types(types)
+        for row in read_csv_rows(source, cols_csv, types, cur.connection.info.timezone, tag_id_col, tag_ids):
+            copy.write_row(row)
+
+def server_reads_local_files(conn, opted_in: bool = False) -> bool:
+    """True if the server can be asked to read our CSV paths itself.
+
+    Only when connected over a Unix socket or when the user says so (--server-reads-data-dir):
+    a loopback TCP address may well be a container with a published port, whose filesystem
+    is not ours.
+    """
+    return opted_in or conn.info.host.startswith("/")
+
+def copy_local_file(
+    cur, spec: TableSpec, source: pa.MemoryMappedFile, tag_ids: pa.ChunkedArray | None = None
+) -> bool:
+    """Let a local server read the CSV from disk itself: COPY ... FROM '<path>' (FORMAT CSV).
+
+    Skips the client-side parse and the socket altogether. Returns False, leaving the
+    transaction usable, if the server cannot see the file or may not read it
+    (needs pg_read_server_files, and the file readable by the server's OS user);
+    the caller then streams `source` instead. The tag_ids are checked on `source` first.
+    """
+    if spec.tag_id_col and tag_ids is not None:
+        check_csv_tag_ids(source, spec.tag_id_col, tag_ids)
+    try:
+        with cur.connection.transaction():  # savepoint: a refused read does not abort the load
+            cur.execute(sql.SQL("""
+                COPY {table}
+                ({cols_csv})
+                FROM {path} WITH (FORMAT CSV, HEADER true)
+            """).format(table=sql.SQL(spec.table), cols_csv=sql.SQL(spec.cols), path=sql.Literal(str(spec.path))))
+    except (psycopg.errors.InsufficientPrivilege, psycopg.errors.UndefinedFile) as e:
+        # Data errors (bad values, duplicate keys) are not caught: streaming would fail the same way
+        print(
+            f"ℹ️  The server could not read {spec.path} ({e.diag.message_primary}); streaming it instead. "
+            "For a server-side read it needs pg_read_server_files, and the file must exist at that path "
+            "and be readable by the server's OS user."
+        )
+        return False
+    return True
+
+def copy_server_file(cur, table: str, cols_csv: str, path: str) -> None:
+    """COPY a zstd-compressed CSV (with header) that sits on the database host.
+
+    The server decompresses it itself, so only the compressed file ever crossed the network.
+    """
+    program = f"zstd -dc {shlex.quote(path)}"
+    cur.execute(sql.SQL("""
+        COPY {table}
+        ({cols_csv})
+        FROM PROGRAM {program} WITH (FORMAT CSV, HEADER true)
+    """).format(table=sql.SQL(table), cols_csv=sql.SQL(cols_csv), program=sql.Literal(program)))
+
+def read_csv_ints(source: pa.MemoryMappedFile, column: str) -> pa.ChunkedArray:
+    """One int4 column of a CSV, read batch by batch (the other columns are never kept)."""
+    batches = iter_csv_batches(source, [column], ["int4"])
+    return pa.chunked_array([batch.column(0) for batch in batches], type=ARROW_TYPES["int4"])
+
+def check_csv_tag_ids(source: pa.MemoryMappedFile, column: str, tag_ids: pa.ChunkedArray) -> None:
+    """check_tag_ids over a whole CSV column, one batch at a time."""
+    first_row = 0
+    for batch in iter_csv_batches(source, [column], ["int4"]):
+        check_tag_ids(batch.column(0), column, tag_ids, first_row)
+        first_row += batch.num_rows
+
+@contextlib.contextmanager
+def open_csv_sources() -> Iterator[dict[str, pa.MemoryMappedFile | None]]:
+    """Memory-map the CSV of every table, by table name; None for a missing optional one.
+
+    Done before connecting: a missing required CSV aborts while the database is untouched,
+    not after its tables have been dropped or truncated. Opening is the existence check.
+    """
+    with contextlib.ExitStack() as stack:
+        sources = {}
+        for spec in TABLE_SPECS.values():
+            try:
+                sources[spec.table] = stack.enter_context(pa.memory_map(str(spec.path)))
+            except FileNotFoundError as e:
+                if spec.required:
+                    raise SystemExit(f"❌ Missing required CSV: {spec.path}") from e
+                sources[spec.table] = None
+        yield sources
+
+def stored_schema_hash(cur) -> str | None:
+    """Schema hash recorded by the last full rebuild, or None if any table is missing."""
+    cur.execute("""
+        SELECT to_regclass('_init_meta') IS NOT NULL
+           AND to_regclass('tag_config') IS NOT NULL
+           AND to_regclass('client_tag') IS NOT NULL
+           AND to_regclass('auto_tag_statistic') IS NOT NULL
+           AND to_regclass('client') IS NOT NULL
+    """)
+    if not cur.fetchone()[0]:
+        return None
+    cur.execute("SELECT schema_hash FROM _init_meta")
+    row = cur.fetchone()
+    return row[0] if row else None
+
+def apply_session_settings(conn: psycopg.Connection) -> None:
+    """SET SESSION_SETTINGS on a new connection, in one round-trip, and commit.
+
+    Done with set_config rather than a libpq `options` startup parameter, which would
+    replace any `options` already in DATABASE_URL and is rejected by transaction poolers.
+    """
+    conn.execute(
+        "SELECT set_config(name, setting, false) FROM unnest(%s::text[], %s::text[]) AS s(name, setting)",
+        (list(SESSION_SETTINGS), list(SESSION_SETTINGS.values())),
+    )
+    conn.commit()  # a rolled-back transaction would undo the settings
+
+def connect(db_url: str) -> psycopg.Connection:
+    """Open a connection with SESSION_SETTINGS applied."""
+    conn = psycopg.connect(db_url)
+    apply_session_settings(conn)
+    return conn
+
+def open_load_pool(db_url: str) -> ConnectionPool:
+    """Pool of loader connections (SESSION_SETTINGS applied), reused across load levels.
+
+    Sized to MAX_PARALLEL_COPIES and opened up front, so the connections are being
+    established while the schema is applied.
+    """
+    return ConnectionPool(
+        db_url,
+        configure=apply_session_settings,
+        min_size=MAX_PARALLEL_COPIES,
+        max_size=MAX_PARALLEL_COPIES,
+        open=True,
+    )
+
+def build_order(tables) -> list[list[str]]:
+    """Group tables into load levels from the parents declared in TABLE_SPECS.
+
+    Kahn's algorithm: each level only references tables of earlier levels, so the tables
+    of one level can be loaded concurrently. Reversing the flattened levels gives a safe
+    DROP order for the foreign keys indexes.sql adds. Only edges between the given tables
+    are considered.
+    """
+    tables = list(tables)
+    parents = {t: {p for p in TABLE_SPECS[t].parents if p in tables and p != t} for t in tables}
+
+    levels = []
+    pending = dict(parents)
+    while pending:
+        ready = [t for t in tables if t in pending and not pending[t]]
+        if not ready:
+            raise SystemExit(f"❌ Foreign key cycle between: {', '.join(pending)}")
+        levels.append(ready)
+        for t in ready:
+            del pending[t]
+        for deps in pending.values():
+            deps.difference_update(ready)
+    return levels
+
+def load_table(
+    conns: ConnectionPool,
+    spec: TableSpec,
+    source: pa.MemoryMappedFile | None,
+    server_data_dir: str | None = None,
+    tag_ids: pa.ChunkedArray | None = None,
+    server_reads_data_dir: bool = False,
+) -> None:
+    """Load one table on a pooled connection and commit, so independent tables can load concurrently.
+
+    `source` is the table's CSV from open_csv_sources (None: optional and missing, skipped).
+
+    With server_data_dir, a required CSV is read from <server_data_dir>/<name>.zst on the
+    database host instead (optional ones keep streaming: the server cannot report them missing).
+    A server that shares our filesystem (server_reads_local_files) is first asked to read the
+    CSV from disk itself (copy_local_file).
+    """
+    try:
+        with conns.connection() as conn:  # commits on success, rolls back on error
+            with conn.cursor() as cur:
+                if server_data_dir and spec.required:
+                    copy_server_file(cur, spec.table, spec.cols, f"{server_data_dir.rstrip('/')}/{spec.path.name}.zst")
+                elif source is None:
+                    print(f"ℹ️  Skipping {spec.path.name} (not found). No FK requires it right now.")
+                elif server_reads_local_files(conn, server_reads_data_dir) and copy_local_file(cur, spec, source, tag_ids):
+                    pass
+                else:
+                    copy_file(cur, spec.table, spec.cols, spec.types, source, spec.tag_id_col, tag_ids)
+    except (psycopg.Error, ValueError) as e:  # ValueError includes Arrow parse errors
+        hint = f"\n   Hint: {spec.hint}" if spec.hint else ""
+        raise SystemExit(f"❌ Loading {spec.path.name} into {spec.table} failed: {e}{hint}") from e
+
+def reset_after_failed_load(conn) -> None:
+    """Empty the tables after a failed load, so the database is not left partly seeded.
+
+    Loaded tables have already been committed (one connection per table), without foreign
+    keys or indexes, and UNLOGGED with --unlogged; they are made LOGGED again here.
+    Tells the user to re-run either way.
+    """
+    print("⚠️  Load failed, emptying the loaded tables…", file=sys.stderr)
+    try:
+        conn.rollback()
+        with conn.cursor() as cur:
+            cur.execute(TRUNCATE_SQL)
+            cur.execute(LOGGED_SQL)
+        conn.commit()
+    except psycopg.Error as e:
+        print(
+            f"❌ Could not empty them ({e}): the database is half-seeded (some tables loaded, no foreign "
+            "keys or indexes, client_tag/auto_tag_statistic possibly UNLOGGED). Re-run init_db.py.",
+            file=sys.stderr,
+        )
+    else:
+        print("ℹ️  Tables are empty and indexes.sql was not applied. Re-run init_db.py.", file=sys.stderr)
 
 def main() -> None:
-    # Required files
-    if not SCHEMA_PATH.exists():
-        raise SystemExit(f"❌ Missing schema.sql at {SCHEMA_PATH}")
-    if not TAG_CONFIG_CSV.exists():
-        raise SystemExit(f"❌ Missing required CSV: {TAG_CONFIG_CSV}")
-    if not CLIENT_TAG_CSV.exists():
-        raise SystemExit(f"❌ Missing required CSV: {CLIENT_TAG_CSV}")
-    if not AUTO_TAG_STAT_CSV.exists():
-        raise SystemExit(f"❌ Missing required CSV: {AUTO_TAG_STAT_CSV}")
+    parser = argparse.ArgumentParser(description="Recreate and seed the tailored_offers database.")
+    parser.add_argument(
+        "--fast-reseed",
+        action="store_true",
+        help="TRUNCATE instead of DROP/CREATE when schema.sql is unchanged since the last run",
+    )
+    parser.add_argument(
+        "--unlogged",
+        action="store_true",
+        help="load client_tag and auto_tag_statistic as UNLOGGED tables and keep them so; skips WAL "
+             "for the bulk rows, but the tables are lost on a crash (throwaway databases only)",
+    )
+    parser.add_argument(
+        "--server-data-dir",
+        metavar="DIR",
+        help="directory on the database host holding <csv>.zst copies of the required CSVs",
+    )
+    parser.add_argument(
+        "--server-reads-data-dir",
+        action="store_true",
+        help="the database server sees ./data at the same path; let it read the CSVs itself "
+             "(implied over a Unix socket)",
+    )
+    args = parser.parse_args()
+
+    # SQL scripts (bytes: psycopg takes bytes queries as-is, no decode/encode).
+    # Missing CSVs are reported by open_csv_sources, before the connection is opened.
+    try:
+        schema_sql = SCHEMA_PATH.read_bytes()
+        indexes_sql = INDEXES_PATH.read_bytes()
+    except FileNotFoundError as e:
+        raise SystemExit(f"❌ Missing SQL script: {e.filename}") from e
 
     db_url = load_db_url()
 
     print("🔌 Connecting to database…")
-    with psycopg.connect(db_url) as conn:
+    with open_csv_sources() as sources, connect(db_url) as conn, open_load_pool(db_url) as conns:
         with conn.cursor() as cur:
-            # 1) Drop
-            print("🗑️  Dropping existing tables (if any)…")
-            cur.execute(DROP_SQL)
-
-            # 2) Schema
-            print("📦 Applying schema.sql…")
-            schema_sql = SCHEMA_PATH.read_text(encoding="utf-8")
-            cur.execute(schema_sql)
-
-            # 3) Optional client load (no FK dependency)
-            if CLIENT_CSV.exists():
-                print("📥 Importing data: client.csv…")
-                copy_file(
-                    cur,
-                    "client",
-                    "client_id, ont_id, name, phone, service_id, city, area, address, type, sip",
-                    CLIENT_CSV
-                )
+            schema_hash = hashlib.sha256(schema_sql).hexdigest()
+
+            # tag_config ids, read locally: the tag_id of every child row is checked before its COPY
+            tag_ids = read_csv_ints(sources["tag_config"], "id")
+
+            rebuild = not (args.fast_reseed and stored_schema_hash(cur) == schema_hash)
+            if not rebuild:
+                # 1+2) Same schema as last time: emptying the tables is enough
+                print("🧹 schema.sql unchanged, truncating existing tables…")
+                cur.execute(POST_LOAD_DROPS_SQL, {"tables": list(TABLE_SPECS)})
+                statements = [TRUNCATE_SQL] + [stmt for _, stmt in cur.fetchall()]
             else:
-                print("ℹ️  Skipping client.csv (not found). No FK requires it right now.")
-
-            # 4) tag_config (with explicit id)
-            print("📥 Importing data: tag_config.csv (with id)…")
-            copy_file(
-                cur,
-                "tag_config",
-                "id, system_name, display_name, tag_type, color, description, is_active, created_at, updated_at",
-                TAG_CONFIG_CSV
-            )
-
-            # 4b) reset identity for tag_config.id
-            print("🔧 Resetting identity sequence for tag_config.id…")
-            cur.execute("""
-                SELECT setval(
-                    pg_get_serial_sequence('tag_config', 'id'),
-                    COALESCE((SELECT MAX(id) FROM tag_config), 0)
-                );
-            """)
-
-            # 5) client_tag
-            print("📥 Importing data: client_tag.csv…")
-            copy_file(
-                cur,
-                "client_tag",
-                "client_id, ont_id, tag_id, assigned_at, assigned_by, reason",
-                CLIENT_TAG_CSV
-            )
-
-            # 6) auto_tag_statistic
-            print("📥 Importing data: auto_tag_statistic.csv…")
-            copy_file(
-                cur,
-                "auto_tag_statistic",
-                "tag_id, assigned_count, run_started_at, run_finished_at",
-                AUTO_TAG_STAT_CSV
-            )
+                # 1) Drop (children first, so their foreign keys go before the parents) + 2) Schema
+                print("🗑️  Dropping existing tables (if any) and 📦 applying schema.sql…")
+                drop_order = [t for level in reversed(build_order(TABLE_SPECS)) for t in level]
+                statements = [f"DROP TABLE IF EXISTS {table}" for table in drop_order] + split_sql(schema_sql)
 
+            # Pipelined: all statements go out back-to-back with one sync
+            with conn.pipeline():
+                for stmt in statements:
+                    cur.execute(stmt)
+                if rebuild:
+                    # Remember which schema.sql these tables come from (for --fast-reseed)
+                    cur.execute("CREATE TABLE IF NOT EXISTS _init_meta (schema_hash TEXT NOT NULL)")
+                    cur.execute("DELETE FROM _init_meta")
+                    cur.execute("INSERT INTO _init_meta (schema_hash) VALUES (%s)", (schema_hash,))
+                # --unlogged: the bulk-loaded tables skip WAL. Otherwise make sure a truncated
+                # table is not still UNLOGGED from an earlier --unlogged run (cheap while empty).
+                if args.unlogged:
+                    for stmt in split_sql(UNLOGGED_SQL):
+                        cur.execute(stmt)
+                elif not rebuild:
+                    for stmt in split_sql(LOGGED_SQL):
+                        cur.execute(stmt)
+
+        # The schema must be committed before the loader connections can see it
         conn.commit()
 
+        # From here on tables commit one by one; a failure must not leave them half-loaded
+        try:
+            # 3) Load level by level: tag_config is committed before the tables that reference it
+            # load, tables of the same level go in parallel (one connection each)
+            with ThreadPoolExecutor(max_workers=MAX_PARALLEL_COPIES) as pool:
+                for level in build_order(TABLE_SPECS):
+                    print(f"📥 Importing data: {' + '.join(TABLE_SPECS[t].path.name for t in level)}…")
+                    futures = [
+                        pool.submit(
+                            load_table, conns, TABLE_SPECS[table], sources[table], args.server_data_dir, tag_ids,
+                            args.server_reads_data_dir,
+                        )
+                        for table in level
+                    ]
+                    done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+                    for future in done:
+                        future.result()  # re-raise the first failure
+
+            if args.unlogged:
+                print("⚠️  client_tag and auto_tag_statistic stay UNLOGGED (--unlogged).")
+
+            # 4) Identity from what was actually loaded (the CSV may be skipped for a server-side
+            # COPY), then foreign keys + indexes over the loaded data: one execute, one round-trip
+            print("🔧 Resetting identity sequence for tag_config.id and 🔗 applying indexes.sql…")
+            with conn.cursor() as cur:
+                cur.execute(SETVAL_SQL + indexes_sql)
+            conn.commit()
+        except BaseException:  # SystemExit from load_table included
+            reset_after_failed_load(conn)
+            raise
+
+        # 5) Planner statistics (and the visibility map) for the fresh tables now, instead
+        # of whenever autovacuum gets to them. VACUUM cannot run inside a transaction block.
+        print("📊 Analyzing loaded tables…")
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"VACUUM (ANALYZE) {', '.join(TABLE_SPECS)}")
+
     print("✅ Database initialized and seeded (client optional).")
 
 if __name__ == "__main__":
@@ -16,16 +16,14 @@ CREATE TABLE client_tag (
   assigned_at TIMESTAMPTZ,
   assigned_by TEXT,
   reason TEXT,
-  PRIMARY KEY (client_id, tag_id),
-  FOREIGN KEY (tag_id) REFERENCES tag_config (id)
+  PRIMARY KEY (client_id, tag_id)
 );
 CREATE TABLE auto_tag_statistic (
   id INT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
   tag_id INT NOT NULL,
   assigned_count INT NOT NULL,
   run_started_at TIMESTAMPTZ NOT NULL,
-  run_finished_at TIMESTAMPTZ NOT NULL,
-  FOREIGN KEY (tag_id) REFERENCES tag_config (id)
+  run_finished_at TIMESTAMPTZ NOT NULL
 );
 CREATE TABLE client (
   client_id INT PRIMARY KEY,
@@ -1,17 +1,21 @@
 import os
+import html
 import logging
 import time
 import tomllib
-from typing import Any, Dict, Mapping, Optional
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 from pathlib import Path
 from base64 import b64encode
+from datetime import date
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-from sqlalchemy import create_engine, select, MetaData, Table
+import psycopg
+from psycopg.pq import Format
+from sqlalchemy import event, select, text, MetaData, Table
 from sqlalchemy.engine import Engine
-from sqlalchemy.pool import NullPool
 from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode, JsCode, DataReturnMode, ColumnsAutoSizeMode
 
 # Page configuration
@@ -23,28 +27,38 @@ logger = logging.getLogger(__name__)
 # Constants
 LOCAL_SECRETS_FILENAME = "local_secrets.toml"
 LOCAL_SECRETS_PATH = Path(__file__).with_name(LOCAL_SECRETS_FILENAME)
+BRAND_LOGO_PATH = Path(__file__).with_name("static").joinpath("fibercare.png")
+BRAND_LOGO_STATIC_URL = "app/static/fibercare.png"  # needs server.enableStaticServing (.streamlit/config.toml)
 DATABASE_URL_ENV_KEYS = ["DATABASE_URL", "DB_URL", "POSTGRES_URL", "POSTGRESQL_URL", "NEON_DATABASE_URL"]
+QUERY_CACHE_TTL_SECONDS = 300  # reruns within this window reuse query results; mutations clear them
+CLIENT_TAGS_CACHE_TTL_SECONDS = 60
+READ_SQL_CHUNKSIZE = 10_000
+DB_POOL_SIZE = 5
+DB_POOL_MAX_OVERFLOW = 5
+DB_POOL_RECYCLE_SECONDS = 1800
+CLIENT_TAGS_PAGE_SIZE = 500
+TAG_TYPE_DTYPE = pd.CategoricalDtype(["A", "M"])
+TAG_TYPE_LABELS = {"A": "Automatic", "M": "Manual"}
+TAG_TYPE_CODES = {label: code for code, label in TAG_TYPE_LABELS.items()}
 
 
 # Utility function for color contrast
-def get_contrast_color(hex_color: str) -> str:
-    """Determine if text should be black or white based on background color luminance."""
-    # Remove # if present
-    hex_color = hex_color.lstrip('#')
+def get_contrast_colors(hex_colors: pd.Series) -> pd.Series:
+    """Black or white text color for a whole column of hex background colors, by luminance."""
+    digits = hex_colors.astype("string").str.lstrip('#').str[:6]
+    valid = digits.str.fullmatch(r"[0-9a-fA-F]{6}").fillna(False).to_numpy(dtype=bool)
     
-    # Convert to RGB
-    try:
-        r = int(hex_color[0:2], 16)
-        g = int(hex_color[2:4], 16)
-        b = int(hex_color[4:6], 16)
-    except (ValueError, IndexError):
-        return '#ffffff'  # Default to white for invalid colors
-    
-    # Calculate relative luminance using WCAG formula
-    luminance = (0.299 * r + 0.587 * g + 0.114 * b) / 255
+    # Parse all valid colors at once, one integer per color (0x00RRGGBB as big-endian uint32),
+    # then split the channels with bit shifts
+    value = np.zeros(len(hex_colors), dtype=np.int64)
+    if valid.any():
+        value[valid] = np.frombuffer(bytes.fromhex(("00" + digits[valid]).str.cat()), dtype=">u4")
+    r, g, b = (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF
     
-    # Return black for light backgrounds, white for dark backgrounds
-    return '#000000' if luminance > 0.5 else '#ffffff'
+    # WCAG-style luminance (0.299r + 0.587g + 0.114b) / 255 > 0.5, scaled to integers:
+    # black on light backgrounds, white on dark and invalid ones
+    light = 299 * r + 587 * g + 114 * b > 127_500
+    return pd.Series(np.where(valid & light, '#000000', '#ffffff'), index=hex_colors.index)
 
 
 # Database helper functions
@@ -92,148 +106,347 @@ def _normalize_database_url(url: str) -> str:
     return raw
 
 
+@st.cache_resource(show_spinner=False)
 def _get_database_url() -> str:
-    cache_key = "_database_url"
-    cached = st.session_state.get(cache_key)
-    if cached:
-        return cached
-    
     local_url = _load_local_database_url()
     if local_url:
-        normalized = _normalize_database_url(local_url)
-        st.session_state[cache_key] = normalized
-        return normalized
+        return _normalize_database_url(local_url)
     
     for key in DATABASE_URL_ENV_KEYS:
         env_val = os.getenv(key)
         if env_val:
-            normalized = _normalize_database_url(env_val)
-            st.session_state[cache_key] = normalized
-            return normalized
+            return _normalize_database_url(env_val)
     
     raise RuntimeError("Database URL not configured.")
 
 
-@st.cache_resource(show_spinner=False)
+class _BinaryCursor(psycopg.Cursor):
+    """Cursor that receives results in binary format: numbers and timestamps are not parsed from text."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.format = Format.BINARY
+
+
+class _BinaryServerCursor(psycopg.ServerCursor):
+    """Server-side (stream_results) counterpart of _BinaryCursor."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.format = Format.BINARY
+
+
+def _use_binary_cursors(dbapi_connection: psycopg.Connection, connection_record: Any) -> None:
+    dbapi_connection.cursor_factory = _BinaryCursor
+    dbapi_connection.server_cursor_factory = _BinaryServerCursor
+
+
 def get_db_engine() -> Engine:
-    url = _get_database_url()
-    return create_engine(
-        url, 
-        poolclass=NullPool, 
+    # st.connection keeps one engine per process and recreates it if a query keeps failing
+    connection = st.connection(
+        "tailored_offers",
+        type="sql",
+        url=_get_database_url(),
+        # Keep connections open between queries and reruns instead of reconnecting each time;
+        # pre_ping and recycle drop connections the server closed while they sat idle
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_POOL_MAX_OVERFLOW,
+        pool_recycle=DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=True,
         future=True,
-        isolation_level="AUTOCOMMIT"
     )
+    engine = connection.engine
+    if not event.contains(engine, "connect", _use_binary_cursors):
+        event.listen(engine, "connect", _use_binary_cursors)
+    return engine
+
+
+def _read_sql(query: str, params: Optional[Dict[str, Any]] = None, dtype_backend: Optional[str] = None) -> pd.DataFrame:
+    """Run a SELECT through a server-side cursor, building the DataFrame chunk by chunk."""
+    engine = get_db_engine()
+    # stream_results: rows arrive READ_SQL_CHUNKSIZE at a time instead of all at once,
+    # inside a read-only transaction that is rolled back when the connection is returned
+    with engine.connect().execution_options(stream_results=True, postgresql_readonly=True) as conn:
+        kwargs = {"dtype_backend": dtype_backend} if dtype_backend else {}
+        chunks = pd.read_sql(query, conn, params=params, chunksize=READ_SQL_CHUNKSIZE, **kwargs)
+        return pd.concat(chunks, ignore_index=True)
 
 
-def fetch_client_tags_dataframe() -> pd.DataFrame:
-    """Fetch all client tags with related tag_config information."""
+def _read_sql_pipeline(queries: List[str]) -> List[pd.DataFrame]:
+    """Run several SELECTs in one psycopg pipeline: one flush, one round-trip, one DataFrame per query."""
     engine = get_db_engine()
+    # The pipeline runs in one read-only transaction, rolled back when the connection is returned
+    with engine.connect().execution_options(postgresql_readonly=True) as conn:
+        raw = conn.connection.driver_connection
+        with raw.pipeline():
+            cursors = [raw.execute(query) for query in queries]
+        # Results are only read once the pipeline has been synced on exit
+        return [
+            pd.DataFrame.from_records(cur.fetchall(), columns=[col.name for col in cur.description], coerce_float=True)
+            for cur in cursors
+        ]
+
+
+CLIENT_TAGS_SELECT = """
+    SELECT 
+        ct.client_id,
+        ct.ont_id,
+        ct.tag_id,
+        ct.assigned_at,
+        ct.assigned_by,
+        ct.reason,
+        tc.display_name,
+        tc.tag_type,
+        tc.color
+    FROM client_tag ct
+    LEFT JOIN tag_config tc ON ct.tag_id = tc.id
+"""
+# Pages are keyed on the primary key, so the next page is an index range scan instead of an OFFSET.
+# One row beyond the page size is fetched to tell whether there is a next page.
+CLIENT_TAGS_PAGE_ORDER = f"ORDER BY ct.client_id, ct.tag_id LIMIT {CLIENT_TAGS_PAGE_SIZE + 1}"
+CLIENT_TAGS_FIRST_PAGE_QUERY = CLIENT_TAGS_SELECT + CLIENT_TAGS_PAGE_ORDER
+
+AUTO_TAG_STATISTICS_QUERY = """
+    SELECT 
+        ats.run_finished_at::date as date,
+        ats.assigned_count,
+        tc.display_name,
+        tc.color
+    FROM auto_tag_statistic ats
+    LEFT JOIN tag_config tc ON ats.tag_id = tc.id
+    WHERE tc.tag_type = 'A'
+      AND ats.run_finished_at >= %(start)s
+      AND ats.run_finished_at < %(end)s::date + 1
+    ORDER BY ats.run_finished_at ASC
+"""
+
+# Slider extremes and tag filter options, without pulling the history itself
+AUTO_TAG_BOUNDS_QUERY = """
+    SELECT 
+        MIN(ats.run_finished_at)::date as min_date,
+        MAX(ats.run_finished_at)::date as max_date,
+        array_agg(DISTINCT tc.display_name COLLATE "C" ORDER BY tc.display_name COLLATE "C") as tag_names
+    FROM auto_tag_statistic ats
+    JOIN tag_config tc ON ats.tag_id = tc.id
+    WHERE tc.tag_type = 'A'
+"""
+
+# Range on run_finished_at (not ::date on the column) so an index on it can be used
+AUTO_TAG_LAST_DAY_QUERY = """
+    WITH last_day AS (
+        SELECT MAX(ats.run_finished_at)::date AS day
+        FROM auto_tag_statistic ats
+        JOIN tag_config tc ON ats.tag_id = tc.id
+        WHERE tc.tag_type = 'A'
+    )
+    SELECT 
+        last_day.day as date,
+        ats.assigned_count,
+        tc.display_name,
+        tc.color
+    FROM auto_tag_statistic ats
+    JOIN tag_config tc ON ats.tag_id = tc.id
+    CROSS JOIN last_day
+    WHERE tc.tag_type = 'A'
+      AND ats.run_finished_at >= last_day.day
+      AND ats.run_finished_at < last_day.day + 1
+    ORDER BY ats.assigned_count ASC, ats.run_finished_at ASC
+"""
+
+MANUAL_TAG_COUNTS_QUERY = """
+    SELECT 
+        tc.display_name,
+        tc.color,
+        COUNT(ct.tag_id) as tag_count
+    FROM client_tag ct
+    LEFT JOIN tag_config tc ON ct.tag_id = tc.id
+    WHERE tc.tag_type = 'M'
+    GROUP BY tc.display_name, tc.color
+    ORDER BY tag_count ASC
+"""
+
+AUTO_TAG_COLUMNS = ["date", "assigned_count", "display_name", "color"]
+AUTO_TAG_BOUNDS_COLUMNS = ["min_date", "max_date", "tag_names"]
+MANUAL_TAG_COUNT_COLUMNS = ["display_name", "color", "tag_count"]
+
+
+def _or_empty(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    return pd.DataFrame(columns=columns) if df.empty else df
+
+
+def _prepare_client_tags_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty:
+        df = pd.DataFrame(columns=[
+            "client_id", "ont_id", "tag_id", "assigned_at", "assigned_by", 
+            "reason", "display_name", "tag_type", "color"
+        ])
     
-    query = """
-        SELECT 
-            ct.client_id,
-            ct.ont_id,
-            ct.tag_id,
-            ct.assigned_at,
-            ct.assigned_by,
-            ct.reason,
-            tc.system_name,
-            tc.display_name,
-            tc.tag_type,
-            tc.color,
-            tc.description,
-            tc.is_active
-        FROM client_tag ct
-        LEFT JOIN tag_config tc ON ct.tag_id = tc.id
-        ORDER BY ct.client_id
-    """
+    # Format datetime columns; Arrow-backed timestamps are already parsed, only the empty frame needs it.
+    # Arrow's strftime prints the fraction of sub-second units, so drop it to keep whole seconds.
+    if "assigned_at" in df.columns:
+        assigned_at = df["assigned_at"]
+        if not isinstance(assigned_at.dtype, pd.ArrowDtype):
+            assigned_at = pd.to_datetime(assigned_at)
+        df["assigned_at"] = assigned_at.dt.floor("s").dt.as_unit("s").dt.strftime("%Y-%m-%d %H:%M:%S")
+    
+    # Two possible values: store as codes, so mapping to labels only renames the categories
+    df["tag_type"] = df["tag_type"].astype(TAG_TYPE_DTYPE)
+    
+    # Fill NaN values; tags missing from tag_config get the default badge color
+    df["color"] = df["color"].fillna("#6b7280")
+    str_cols = [col for col in df.columns if col not in ("client_id", "tag_id", "tag_type")]
+    df[str_cols] = df[str_cols].fillna("")
     
+    # A handful of names, colors and assigners repeat across every row: keep each distinct value once.
+    # Filled first, so no "" category has to be added.
+    for col in ("display_name", "color", "assigned_by"):
+        df[col] = df[col].astype("category")
+    
+    return df
+
+
+def _client_tags_conditions(tag_type: Optional[str], client_id: Optional[int]) -> Tuple[List[str], Dict[str, Any]]:
+    conditions = []
+    params = {}
+    if tag_type:
+        conditions.append("tc.tag_type = %(tag_type)s")
+        params["tag_type"] = tag_type
+    if client_id is not None:
+        conditions.append("ct.client_id = %(client_id)s")
+        params["client_id"] = client_id
+    return conditions, params
+
+
+@st.cache_data(ttl=QUERY_CACHE_TTL_SECONDS, show_spinner=False)
+def _load_client_tags_dataframe(client_id: Optional[int] = None) -> pd.DataFrame:
+    conditions, params = _client_tags_conditions(None, client_id)
+    # No ORDER BY: the rows go to an AgGrid that sorts in the browser
+    query = CLIENT_TAGS_SELECT
+    if conditions:
+        query = CLIENT_TAGS_SELECT + f"WHERE {' AND '.join(conditions)}"
+    
+    # Arrow-backed columns: the text columns are contiguous buffers instead of Python objects
+    return _prepare_client_tags_dataframe(_read_sql(query, params or None, dtype_backend="pyarrow"))
+
+
+def fetch_client_tags_dataframe(client_id: Optional[int] = None) -> pd.DataFrame:
+    """Fetch client tags with the tag_config fields the grids use, optionally for one client."""
     try:
-        df = pd.read_sql(query, engine)
-        if df.empty:
-            df = pd.DataFrame(columns=[
-                "client_id", "ont_id", "tag_id", "assigned_at", "assigned_by", 
-                "reason", "system_name", "display_name", "tag_type", "color", 
-                "description", "is_active"
-            ])
-        
-        # Format datetime columns
-        if "assigned_at" in df.columns:
-            df["assigned_at"] = pd.to_datetime(df["assigned_at"]).dt.strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Fill NaN values
-        for col in df.columns:
-            if col not in ["client_id", "tag_id", "is_active"]:
-                df[col] = df[col].fillna("")
-        
-        if "is_active" in df.columns:
-            df["is_active"] = df["is_active"].fillna(True)
-        
-        return df
+        return _load_client_tags_dataframe(client_id)
     except Exception as exc:
         logger.exception("Failed to fetch client tags: %s", exc)
         st.error(f"Database error: {exc}")
         return pd.DataFrame()
 
 
-def fetch_auto_tag_statistics() -> pd.DataFrame:
-    """Fetch auto tag statistics with tag information for chart."""
-    engine = get_db_engine()
-    
-    query = """
-        SELECT 
-            ats.run_finished_at::date as date,
-            ats.assigned_count,
-            tc.display_name,
-            tc.color
-        FROM auto_tag_statistic ats
-        LEFT JOIN tag_config tc ON ats.tag_id = tc.id
-        WHERE tc.tag_type = 'A'
-        ORDER BY ats.run_finished_at ASC
-    """
+@st.cache_data(ttl=QUERY_CACHE_TTL_SECONDS, show_spinner=False)
+def _load_client_tags_page(tag_type: Optional[str] = None, after: Optional[Tuple[int, int]] = None) -> pd.DataFrame:
+    conditions, params = _client_tags_conditions(tag_type, None)
+    if after is not None:
+        conditions.append("(ct.client_id, ct.tag_id) > (%(after_client_id)s, %(after_tag_id)s)")
+        params["after_client_id"], params["after_tag_id"] = after
     
+    where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+    query = CLIENT_TAGS_SELECT + where + CLIENT_TAGS_PAGE_ORDER
+    return _prepare_client_tags_dataframe(_read_sql(query, params or None, dtype_backend="pyarrow"))
+
+
+def fetch_client_tags_page(tag_type: Optional[str] = None, after: Optional[Tuple[int, int]] = None) -> pd.DataFrame:
+    """Fetch one page of client tags ordered by (client_id, tag_id), optionally one tag_type ('A' or 'M'), starting after the given key."""
+    try:
+        return _load_client_tags_page(tag_type, after)
+    except Exception as exc:
+        logger.exception("Failed to fetch client tags page: %s", exc)
+        st.error(f"Database error: {exc}")
+        return pd.DataFrame()
+
+
+@st.cache_data(ttl=QUERY_CACHE_TTL_SECONDS, show_spinner=False)
+def _load_auto_tag_statistics(start: date, end: date) -> pd.DataFrame:
+    df = _read_sql(AUTO_TAG_STATISTICS_QUERY, {"start": start, "end": end})
+    return _or_empty(df, AUTO_TAG_COLUMNS)
+
+
+def fetch_auto_tag_statistics(start: date, end: date) -> pd.DataFrame:
+    """Fetch auto tag statistics with tag information for chart, for run days start..end inclusive."""
     try:
-        df = pd.read_sql(query, engine)
-        if df.empty:
-            df = pd.DataFrame(columns=["date", "assigned_count", "display_name", "color"])
-        return df
+        return _load_auto_tag_statistics(start, end)
     except Exception as exc:
         logger.exception("Failed to fetch auto tag statistics: %s", exc)
         st.error(f"Database error: {exc}")
         return pd.DataFrame()
 
 
+@st.cache_data(ttl=QUERY_CACHE_TTL_SECONDS, show_spinner=False)
+def _load_auto_tag_last_day() -> pd.DataFrame:
+    return _or_empty(_read_sql(AUTO_TAG_LAST_DAY_QUERY), AUTO_TAG_COLUMNS)
+
+
+def fetch_auto_tag_last_day() -> pd.DataFrame:
+    """Fetch the automatic tag counts of the most recent run day, smallest count first."""
+    try:
+        return _load_auto_tag_last_day()
+    except Exception as exc:
+        logger.exception("Failed to fetch last day auto tag statistics: %s", exc)
+        st.error(f"Database error: {exc}")
+        return pd.DataFrame()
+
+
+@st.cache_data(ttl=QUERY_CACHE_TTL_SECONDS, show_spinner=False)
+def _load_manual_tag_counts() -> pd.DataFrame:
+    return _or_empty(_read_sql(MANUAL_TAG_COUNTS_QUERY), MANUAL_TAG_COUNT_COLUMNS)
+
+
 def fetch_manual_tag_counts() -> pd.DataFrame:
     """Fetch manual tag counts grouped by tag."""
-    engine = get_db_engine()
-    
-    query = """
-        SELECT 
-            tc.display_name,
-            tc.color,
-            COUNT(ct.tag_id) as tag_count
-        FROM client_tag ct
-        LEFT JOIN tag_config tc ON ct.tag_id = tc.id
-        WHERE tc.tag_type = 'M'
-        GROUP BY tc.display_name, tc.color
-        ORDER BY tag_count ASC
-    """
-    
     try:
-        df = pd.read_sql(query, engine)
-        if df.empty:
-            df = pd.DataFrame(columns=["display_name", "color", "tag_count"])
-        return df
+        return _load_manual_tag_counts()
     except Exception as exc:
         logger.exception("Failed to fetch manual tag counts: %s", exc)
         st.error(f"Database error: {exc}")
         return pd.DataFrame()
 
 
-def fetch_tag_config(tag_type: str = None) -> pd.DataFrame:
-    """Fetch tag configuration from tag_config table."""
-    engine = get_db_engine()
-    
+@st.cache_data(ttl=QUERY_CACHE_TTL_SECONDS, show_spinner=False)
+def _load_dashboard_bundle() -> Dict[str, pd.DataFrame]:
+    bounds_df, last_day_df, manual_df, tags_df = _read_sql_pipeline([
+        AUTO_TAG_BOUNDS_QUERY,
+        AUTO_TAG_LAST_DAY_QUERY,
+        MANUAL_TAG_COUNTS_QUERY,
+        CLIENT_TAGS_FIRST_PAGE_QUERY,
+    ])
+    return {
+        # MIN/MAX always return a row; no statistics at all means an empty frame
+        "auto_bounds": _or_empty(bounds_df.dropna(subset=["min_date"]), AUTO_TAG_BOUNDS_COLUMNS),
+        "auto_last_day": _or_empty(last_day_df, AUTO_TAG_COLUMNS),
+        "manual_counts": _or_empty(manual_df, MANUAL_TAG_COUNT_COLUMNS),
+        "client_tags": _prepare_client_tags_dataframe(tags_df.convert_dtypes(dtype_backend="pyarrow")),
+    }
+
+
+def fetch_dashboard_bundle() -> Dict[str, pd.DataFrame]:
+    """Fetch every frame the Dashboard subtab needs in a single round-trip."""
+    try:
+        return _load_dashboard_bundle()
+    except Exception as exc:
+        logger.exception("Failed to fetch dashboard data: %s", exc)
+        st.error(f"Database error: {exc}")
+        return {key: pd.DataFrame() for key in ("auto_bounds", "auto_last_day", "manual_counts", "client_tags")}
+
+
+def _clean_tag_config(df: pd.DataFrame) -> pd.DataFrame:
+    # Fill the optional fields once here, so the grids and edit dialogs need no per-row NaN checks,
+    # and work out the badge text color for the whole column instead of per cell in the browser
+    return df.assign(
+        color=df["color"].fillna("#6b7280"),
+        description=df["description"].fillna(""),
+        is_active=df["is_active"].fillna(True).astype(bool),
+        text_color=lambda d: get_contrast_colors(d["color"]),
+    )
+
+
+@st.cache_data(ttl=QUERY_CACHE_TTL_SECONDS, show_spinner=False)
+def _load_tag_config(tag_type: str = None) -> pd.DataFrame:
     if tag_type:
         query = """
             SELECT 
@@ -250,74 +463,94 @@ def fetch_tag_config(tag_type: str = None) -> pd.DataFrame:
             WHERE tag_type = %(tag_type)s
             ORDER BY id
         """
-        try:
-            df = pd.read_sql(query, engine, params={"tag_type": tag_type})
-        except Exception as exc:
-            logger.exception("Failed to fetch tag config: %s", exc)
-            st.error(f"Database error: {exc}")
-            return pd.DataFrame()
-    else:
-        query = """
-            SELECT 
-                id,
-                system_name,
-                display_name,
-                tag_type,
-                color,
-                description,
-                is_active,
-                created_at,
-                updated_at
-            FROM tag_config
-            ORDER BY tag_type, id
-        """
-        try:
-            df = pd.read_sql(query, engine)
-        except Exception as exc:
-            logger.exception("Failed to fetch tag config: %s", exc)
-            st.error(f"Database error: {exc}")
-            return pd.DataFrame()
+        return _clean_tag_config(_read_sql(query, {"tag_type": tag_type}))
     
-    return df
+    query = """
+        SELECT 
+            id,
+            system_name,
+            display_name,
+            tag_type,
+            color,
+            description,
+            is_active,
+            created_at,
+            updated_at
+        FROM tag_config
+        ORDER BY tag_type, id
+    """
+    return _clean_tag_config(_read_sql(query))
+
+
+def fetch_tag_config(tag_type: str = None) -> pd.DataFrame:
+    """Fetch tag configuration from tag_config table."""
+    try:
+        return _load_tag_config(tag_type)
+    except Exception as exc:
+        logger.exception("Failed to fetch tag config: %s", exc)
+        st.error(f"Database error: {exc}")
+        return pd.DataFrame()
+
+
+# Write statements, built once at import instead of per call. NULL parameters leave the
+# column unchanged, so one UPDATE statement serves every combination of edited fields.
+_STMT_UPDATE_TAG_CONFIG = text("""
+    UPDATE tag_config
+    SET display_name = COALESCE(:display_name, display_name),
+        color = COALESCE(:color, color),
+        is_active = COALESCE(:is_active, is_active),
+        description = COALESCE(:description, description),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = :tag_id
+""")
+
+_STMT_CREATE_MANUAL_TAG = text("""
+    INSERT INTO tag_config (system_name, display_name, tag_type, color, description, is_active, created_at, updated_at)
+    VALUES (:system_name, :display_name, 'M', :color, :description, :is_active, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+""")
+
+_STMT_ADD_CLIENT_TAG = text("""
+    INSERT INTO client_tag (client_id, ont_id, tag_id, assigned_at, assigned_by, reason)
+    VALUES (:client_id, :ont_id, :tag_id, CURRENT_TIMESTAMP, :assigned_by, :reason)
+    ON CONFLICT (client_id, tag_id) DO NOTHING
+""")
+
+_STMT_REMOVE_CLIENT_TAG = text("""
+    DELETE FROM client_tag
+    WHERE client_id = :client_id AND tag_id = :tag_id
+""")
 
 
 def update_tag_config(tag_id: int, display_name: str = None, color: str = None, is_active: bool = None, description: str = None) -> bool:
     """Update tag configuration in the database."""
     engine = get_db_engine()
     
-    updates = []
-    params = {"tag_id": tag_id}
-    
-    if display_name is not None:
-        updates.append("display_name = %(display_name)s")
-        params["display_name"] = display_name
-    
-    if color is not None:
-        updates.append("color = %(color)s")
-        params["color"] = color
-    
-    if is_active is not None:
-        updates.append("is_active = %(is_active)s")
-        params["is_active"] = is_active
-    
-    if description is not None:
-        updates.append("description = %(description)s")
-        params["description"] = description
+    params = {
+        "tag_id": tag_id,
+        "display_name": display_name,
+        "color": color,
+        "is_active": is_active,
+        "description": description
+    }
     
-    if not updates:
+    if all(value is None for key, value in params.items() if key != "tag_id"):
         return False
     
-    updates.append("updated_at = CURRENT_TIMESTAMP")
-    
-    query = f"""
-        UPDATE tag_config
-        SET {', '.join(updates)}
-        WHERE id = %(tag_id)s
-    """
-    
     try:
         with engine.begin() as conn:
-            conn.exec_driver_sql(query, params)
+            conn.execute(_STMT_UPDATE_TAG_CONFIG, params)
+        _load_tag_config.clear()
+        # Names and colors also show up in every client tag and statistics query;
+        # active flags and descriptions are only read through tag_config
+        if display_name is not None or color is not None:
+            _load_client_tags_dataframe.clear()
+            _load_client_tags_page.clear()
+            _load_auto_tag_statistics.clear()
+            _load_auto_tag_last_day.clear()
+            _load_manual_tag_counts.clear()
+            _load_dashboard_bundle.clear()
+            _load_clients_with_tags.clear()
+            _load_client_tags.clear()
         return True
     except Exception as exc:
         logger.exception("Failed to update tag config: %s", exc)
@@ -329,11 +562,6 @@ def create_manual_tag(system_name: str, display_name: str, color: str, descripti
     """Create a new manual tag in the database."""
     engine = get_db_engine()
     
-    query = """
-        INSERT INTO tag_config (system_name, display_name, tag_type, color, description, is_active, created_at, updated_at)
-        VALUES (%(system_name)s, %(display_name)s, 'M', %(color)s, %(description)s, %(is_active)s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-    """
-    
     params = {
         "system_name": system_name,
         "display_name": display_name,
@@ -344,7 +572,8 @@ def create_manual_tag(system_name: str, display_name: str, color: str, descripti
     
     try:
         with engine.begin() as conn:
-            conn.exec_driver_sql(query, params)
+            conn.execute(_STMT_CREATE_MANUAL_TAG, params)
+        _load_tag_config.clear()
         return True
     except Exception as exc:
         logger.exception("Failed to create manual tag: %s", exc)
@@ -352,10 +581,8 @@ def create_manual_tag(system_name: str, display_name: str, color: str, descripti
         return False
 
 
-def fetch_client_tags(client_id: int) -> pd.DataFrame:
-    """Fetch tags assigned to a specific client."""
-    engine = get_db_engine()
-    
+@st.cache_data(ttl=CLIENT_TAGS_CACHE_TTL_SECONDS, show_spinner=False)
+def _load_client_tags(client_id: int) -> pd.DataFrame:
     query = """
         SELECT 
             ct.tag_id,
@@ -365,8 +592,7 @@ def fetch_client_tags(client_id: int) -> pd.DataFrame:
             tc.system_name,
             tc.display_name,
             tc.tag_type,
-            tc.color,
-            tc.description
+            tc.color
         FROM client_tag ct
         LEFT JOIN tag_config tc ON ct.tag_id = tc.id
         WHERE ct.client_id = %(client_id)s
@@ -375,9 +601,18 @@ def fetch_client_tags(client_id: int) -> pd.DataFrame:
     
     params = {"client_id": client_id}
     
+    df = _read_sql(query, params)
+    # Badge defaults and text color are filled in once here and cached with the rows
+    df["color"] = df["color"].fillna("#6b7280")
+    df["display_name"] = df["display_name"].fillna("Unknown")
+    df["text_color"] = get_contrast_colors(df["color"])
+    return df
+
+
+def fetch_client_tags(client_id: int) -> pd.DataFrame:
+    """Fetch tags assigned to a specific client."""
     try:
-        df = pd.read_sql(query, engine, params=params)
-        return df
+        return _load_client_tags(client_id)
     except Exception as exc:
         logger.exception("Failed to fetch client tags: %s", exc)
         st.error(f"Database error: {exc}")
@@ -386,60 +621,74 @@ def fetch_client_tags(client_id: int) -> pd.DataFrame:
 
 def add_client_tag(client_id: int, tag_id: int, ont_id: str = None, assigned_by: str = "System", reason: str = "") -> bool:
     """Add a tag to a client."""
-    engine = get_db_engine()
-    
-    query = """
-        INSERT INTO client_tag (client_id, ont_id, tag_id, assigned_at, assigned_by, reason)
-        VALUES (%(client_id)s, %(ont_id)s, %(tag_id)s, CURRENT_TIMESTAMP, %(assigned_by)s, %(reason)s)
-        ON CONFLICT (client_id, tag_id) DO NOTHING
-    """
-    
-    params = {
+    return add_client_tags_bulk([{
         "client_id": client_id,
         "ont_id": ont_id,
         "tag_id": tag_id,
         "assigned_by": assigned_by,
         "reason": reason
-    }
+    }])
+
+
+def add_client_tags_bulk(rows: list[dict]) -> bool:
+    """Add several (client_id, tag_id) assignments in one transaction (executemany); ont_id, assigned_by and reason are optional."""
+    if not rows:
+        return False
+    
+    engine = get_db_engine()
+    params = [{"ont_id": None, "assigned_by": "System", "reason": "", **row} for row in rows]
     
     try:
         with engine.begin() as conn:
-            conn.exec_driver_sql(query, params)
+            inserted = conn.execute(_STMT_ADD_CLIENT_TAG, params).rowcount
+        # ON CONFLICT DO NOTHING leaves tags the client already had out of the row count;
+        # when nothing was inserted the cached reads are still current
+        if inserted:
+            _load_client_tags_dataframe.clear()
+            _load_client_tags_page.clear()
+            _load_manual_tag_counts.clear()
+            _load_dashboard_bundle.clear()
+            _load_clients_with_tags.clear()
+            for client_id in {row["client_id"] for row in rows}:
+                _load_client_tags.clear(client_id)
         return True
     except Exception as exc:
-        logger.exception("Failed to add client tag: %s", exc)
+        logger.exception("Failed to add client tags: %s", exc)
         st.error(f"Database error: {exc}")
         return False
 
 
 def remove_client_tag(client_id: int, tag_id: int) -> bool:
     """Remove a tag from a client."""
-    engine = get_db_engine()
-    
-    query = """
-        DELETE FROM client_tag
-        WHERE client_id = %(client_id)s AND tag_id = %(tag_id)s
-    """
+    return remove_client_tags_bulk([{"client_id": client_id, "tag_id": tag_id}])
+
+
+def remove_client_tags_bulk(rows: list[dict]) -> bool:
+    """Remove several (client_id, tag_id) assignments in one transaction (executemany)."""
+    if not rows:
+        return False
     
-    params = {
-        "client_id": client_id,
-        "tag_id": tag_id
-    }
+    engine = get_db_engine()
     
     try:
         with engine.begin() as conn:
-            conn.exec_driver_sql(query, params)
+            conn.execute(_STMT_REMOVE_CLIENT_TAG, rows)
+        _load_client_tags_dataframe.clear()
+        _load_client_tags_page.clear()
+        _load_manual_tag_counts.clear()
+        _load_dashboard_bundle.clear()
+        _load_clients_with_tags.clear()
+        for client_id in {row["client_id"] for row in rows}:
+            _load_client_tags.clear(client_id)
         return True
     except Exception as exc:
-        logger.exception("Failed to remove client tag: %s", exc)
+        logger.exception("Failed to remove client tags: %s", exc)
         st.error(f"Database error: {exc}")
         return False
 
 
-def fetch_clients() -> pd.DataFrame:
-    """Fetch all clients from the client table."""
-    engine = get_db_engine()
-    
+@st.cache_data(ttl=QUERY_CACHE_TTL_SECONDS, show_spinner=False)
+def _load_clients() -> pd.DataFrame:
     query = """
         SELECT 
             client_id,
@@ -456,50 +705,211 @@ def fetch_clients() -> pd.DataFrame:
         ORDER BY client_id
     """
     
+    df = _read_sql(query)
+    if df.empty:
+        df = pd.DataFrame(columns=[
+            "client_id", "ont_id", "name", "phone", "service_id",
+            "city", "area", "address", "type", "sip"
+        ])
+    
+    # Fill NaN values
+    str_cols = [col for col in df.columns if col != "client_id"]
+    df[str_cols] = df[str_cols].fillna("")
+    
+    return df
+
+
+def fetch_clients() -> pd.DataFrame:
+    """Fetch all clients from the client table."""
     try:
-        df = pd.read_sql(query, engine)
-        if df.empty:
-            df = pd.DataFrame(columns=[
-                "client_id", "ont_id", "name", "phone", "service_id",
-                "city", "area", "address", "type", "sip"
-            ])
-        
-        # Fill NaN values
-        for col in df.columns:
-            if col not in ["client_id"]:
-                df[col] = df[col].fillna("")
-        
-        return df
+        return _load_clients()
     except Exception as exc:
         logger.exception("Failed to fetch clients: %s", exc)
         st.error(f"Database error: {exc}")
         return pd.DataFrame()
 
 
-# Load CSS
-with open("tailored_offers_theme.css") as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+@st.cache_data(ttl=QUERY_CACHE_TTL_SECONDS, show_spinner=False)
+def _load_clients_with_tags() -> pd.DataFrame:
+    # Tags are aggregated per client in Postgres; psycopg decodes the json column into lists of dicts
+    query = """
+        SELECT 
+            c.client_id,
+            c.name,
+            c.phone,
+            c.service_id,
+            c.city,
+            c.area,
+            c.address,
+            c.type,
+            c.sip,
+            COALESCE(
+                json_agg(
+                    json_build_object('display_name', tc.display_name, 'color', COALESCE(tc.color, '#6b7280'))
+                    ORDER BY ct.tag_id
+                ) FILTER (WHERE ct.tag_id IS NOT NULL),
+                '[]'
+            ) AS tags
+        FROM client c
+        LEFT JOIN client_tag ct ON ct.client_id = c.client_id
+        LEFT JOIN tag_config tc ON ct.tag_id = tc.id
+        GROUP BY c.client_id
+        ORDER BY c.client_id
+    """
+    
+    df = _read_sql(query)
+    if df.empty:
+        df = pd.DataFrame(columns=[
+            "client_id", "name", "phone", "service_id",
+            "city", "area", "address", "type", "sip", "tags"
+        ])
+    
+    # Fill NaN values
+    str_cols = [col for col in df.columns if col not in ("client_id", "tags")]
+    df[str_cols] = df[str_cols].fillna("")
+    
+    return df
 
-# Initialize session state
-if "active_tab" not in st.session_state:
-    st.session_state.active_tab = "Home"
 
-# Honor query param for tab switching
-if "tab" in st.query_params:
-    requested_tab = st.query_params["tab"]
-    if requested_tab in ["Home", "Requests", "Card", "Client", "CPE", "IVR", "Settings", "Dahi Nemutlu", "Exit"]:
-        st.session_state.active_tab = requested_tab
+def fetch_clients_with_tags() -> pd.DataFrame:
+    """Fetch all clients with their tags as a list of {display_name, color} dicts per client."""
+    try:
+        return _load_clients_with_tags()
+    except Exception as exc:
+        logger.exception("Failed to fetch clients with tags: %s", exc)
+        st.error(f"Database error: {exc}")
+        return pd.DataFrame()
 
 
-def _get_brand_logo_data_uri() -> Optional[str]:
-    logo_path = Path(__file__).with_name("assets").joinpath("fibercare.png")
-    try:
-        with logo_path.open("rb") as fh:
-            encoded = b64encode(fh.read()).decode("ascii")
-        return f"data:image/png;base64,{encoded}"
-    except Exception:
-        return None
+# Tag badge for the client-tag grids; colors come precomputed in the hidden _bg/_fg columns
+TAG_BADGE_RENDERER = JsCode("""
+    function(params) {
+        const badge = document.createElement('span');
+        badge.style.cssText = 'display:inline-block;padding:2px 8px;border-radius:9999px;'
+            + 'font-weight:600;font-size:13px;line-height:1.3;'
+            + 'background-color:' + (params.data._bg || '#6b7280') + ';color:' + (params.data._fg || '#ffffff');
+        badge.textContent = params.data.display_name || '';
+        return badge;
+    }
+""")
+
+# Fit the columns to their content once the rows are in, and again whenever the grid resizes
+AUTOSIZE_ON_FIRST_DATA_RENDERED = JsCode("""
+    function(params) {
+        if (!params || !params.columnApi || !params.columnApi.autoSizeAllColumns) {
+            return;
+        }
+        const autoSize = () => {
+            try { params.columnApi.autoSizeAllColumns(); } catch (e) {}
+            try { params.api.resetRowHeights(); } catch (e) {}
+        };
+        window.requestAnimationFrame(autoSize);
+        [0, 120, 400].forEach((delay) => {
+            window.setTimeout(autoSize, delay);
+        });
+    }
+""")
+
+AUTOSIZE_ON_GRID_SIZE_CHANGED = JsCode("""
+    function(params) {
+        if (!params || !params.columnApi || !params.columnApi.autoSizeAllColumns) {
+            return;
+        }
+        const run = () => {
+            try { params.columnApi.autoSizeAllColumns(); } catch (e) {}
+            try { params.api.resetRowHeights(); } catch (e) {}
+        };
+        window.requestAnimationFrame(run);
+        window.setTimeout(run, 150);
+    }
+""")
+
 
+@st.cache_data(show_spinner=False)
+def _build_tag_config_grid_options(schema: pd.DataFrame) -> Dict[str, Any]:
+    """Grid options for the Settings tag grids; they depend only on the columns, so pass an empty slice."""
+    gb = GridOptionsBuilder.from_dataframe(schema)
+
+    gb.configure_default_column(
+        editable=False,
+        resizable=True,
+        filter=False,
+        sortable=False,
+        suppressMenu=True,
+    )
+
+    # Configure edit button column (first column)
+    gb.configure_column(
+        "edit",
+        headerName="",
+        width=60,
+        cellStyle={'textAlign': 'center', 'cursor': 'pointer', 'fontSize': '18px'},
+        editable=False,
+        pinned='left',
+        suppressSizeToFit=True
+    )
+
+    # Configure Tag column with color background using cellStyle function
+    gb.configure_column(
+        "display_name", 
+        headerName="Tag", 
+        autoHeaderHeight=True, 
+        wrapHeaderText=True,
+        cellStyle=JsCode("""
+            function(params) {
+                return {
+                    'backgroundColor': params.data.color,
+                    'color': params.data.text_color,
+                    'fontWeight': '500',
+                    'padding': '8px 12px',
+                    'display': 'flex',
+                    'alignItems': 'center',
+                    'height': '100%'
+                };
+            }
+        """)
+    )
+
+    # Hide color columns (but keep them in data for styling)
+    gb.configure_column("color", hide=True)
+    gb.configure_column("text_color", hide=True)
+
+    # Configure other data columns
+    gb.configure_column("is_active", headerName="Active", autoHeaderHeight=True, wrapHeaderText=True)
+    gb.configure_column("description", headerName="Description", flex=1, autoHeaderHeight=True, wrapHeaderText=True)
+
+    # Hide ID column but keep it in data
+    gb.configure_column("id", hide=True)
+
+    # Disable selection completely
+    gb.configure_selection(selection_mode=None, use_checkbox=False)
+
+    # Configure cell clicked event to only select on edit column
+    gb.configure_grid_options(
+        onCellClicked=JsCode("""
+            function(params) {
+                if (params.column.colId === 'edit') {
+                    params.api.deselectAll();
+                    params.node.setSelected(true);
+                }
+            }
+        """),
+        suppressRowClickSelection=True,
+        rowSelection='single'
+    )
+
+    # build() returns a defaultdict of a local class, which st.cache_data cannot pickle
+    return dict(gb.build())
+
+
+@st.cache_resource(show_spinner=False)
+def _load_css() -> str:
+    with open("tailored_offers_theme.css") as f:
+        return f"<style>{f.read()}</style>"
+
+
+# Load CSS
+st.html(_load_css())
 
 # Top-level tab icons
 TAB_ICONS = {
@@ -514,58 +924,182 @@ TAB_ICONS = {
     "Exit": "exit_to_app",
 }
 TAB_NAMES = list(TAB_ICONS.keys())
+_VALID_TABS = frozenset(TAB_ICONS)
+
+# Client page subtabs (Clients / Client Tags)
+CLIENT_PAGE_SUBTAB_ICONS = {"Clients": "group", "Client Tags": "label"}
+_VALID_CLIENT_PAGE_SUBTABS = frozenset(CLIENT_PAGE_SUBTAB_ICONS)
+
+# Second-level tabs for Client Tags subtab (Dashboard / Settings)
+CLIENT_TAGS_SUBTAB_ICONS = {"Dashboard": "dashboard", "Settings": "settings"}
+_VALID_CLIENT_TAGS_SUBTABS = frozenset(CLIENT_TAGS_SUBTAB_ICONS)
+
+# Client detail subtabs; only CPEs and Tags are clickable
+CLIENT_SUBTAB_ICONS = {
+    "CPEs": "router",
+    "Tags": "label",
+    "Assign": "assignment_turned_in",
+    "SIP": "dialer_sip",
+    "Client Operations": "assignment",
+    "Client Attachments": "attachment",
+    "Client Attachments KYC": "fingerprint",
+}
+_VALID_CLIENT_SUBTABS = frozenset(CLIENT_SUBTAB_ICONS)
+
+# Initialize session state
+if "active_tab" not in st.session_state:
+    st.session_state.active_tab = "Home"
+
+# Honor query param for tab switching
+if "tab" in st.query_params:
+    requested_tab = st.query_params["tab"]
+    if requested_tab in _VALID_TABS:
+        st.session_state.active_tab = requested_tab
+
+
+@st.cache_resource(show_spinner=False)
+def _get_brand_logo_src() -> Optional[str]:
+    if not BRAND_LOGO_PATH.is_file():
+        return None
+    # A static URL lets the browser cache the logo; inline it only when static serving is off
+    if st.get_option("server.enableStaticServing"):
+        return BRAND_LOGO_STATIC_URL
+    try:
+        encoded = b64encode(BRAND_LOGO_PATH.read_bytes()).decode("ascii")
+        return f"data:image/png;base64,{encoded}"
+    except Exception:
+        return None
+
 
 # Build top bar
-html = ['<div class="topbar">']
-
-# Brand/Logo
-logo_uri = _get_brand_logo_data_uri()
-logo_markup = f'<img src="{logo_uri}" alt="FiberCare logo" />' if logo_uri else ""
-html.append(f'<div class="brand">{logo_markup}<span class="brandStack">FiberCare</span></div>')
-
-# Build tab items
-tab_items = []
-for name in TAB_NAMES:
-    icon = f'<span class="material-icons">{TAB_ICONS[name]}</span>'
-    if name == "Client":
-        active_cls = " call-center-active" if st.session_state.active_tab == name else ""
-        tab_items.append(
-            f'<a href="?tab=Client" target="_self" class="tab{active_cls}">{icon} {name}</a>'
-        )
-    elif name == "Dahi Nemutlu":
-        tab_items.append(
-            '<span class="tab notifications-tab">'
-            f'<span class="notifications-trigger" aria-label="Notifications">{icon}</span>'
-            f'<span class="notifications-name">{name}</span>'
-            '</span>'
+@st.cache_data(show_spinner=False)
+def _render_topbar(active_tab: str) -> str:
+    """Top bar markup; only changes with the active tab, so it is built once per tab."""
+    html = ['<div class="topbar">']
+
+    # Brand/Logo
+    logo_src = _get_brand_logo_src()
+    logo_markup = f'<img src="{logo_src}" alt="FiberCare logo" />' if logo_src else ""
+    html.append(f'<div class="brand">{logo_markup}<span class="brandStack">FiberCare</span></div>')
+
+    # Build tab items
+    tab_items = []
+    for name in TAB_NAMES:
+        icon = f'<span class="material-icons">{TAB_ICONS[name]}</span>'
+        if name == "Client":
+            active_cls = " call-center-active" if active_tab == name else ""
+            tab_items.append(
+                f'<a href="?tab=Client" target="_self" class="tab{active_cls}">{icon} {name}</a>'
+            )
+        elif name == "Dahi Nemutlu":
+            tab_items.append(
+                '<span class="tab notifications-tab">'
+                f'<span class="notifications-trigger" aria-label="Notifications">{icon}</span>'
+                f'<span class="notifications-name">{name}</span>'
+                '</span>'
+            )
+        elif name == "Exit":
+            tab_items.append(f'<span class="tab-disabled" title="Exit">{icon}</span>')
+        else:
+            active_cls = " active" if active_tab == name else ""
+            tab_items.append(f'<span class="tab-disabled{active_cls}">{icon} {name}</span>')
+
+    # Inline tabs row
+    html.append('<div class="tabs" id="topbar-tabs">')
+    html.extend(tab_items)
+    html.append('</div>')
+
+    # Burger toggle (CSS only) and overlay drawer menu
+    html.append('<input type="checkbox" id="topbar-burger-toggle" class="burger-toggle" />')
+    html.append('<label for="topbar-burger-toggle" class="burger" id="topbar-burger" aria-label="Menu"><span class="material-icons">menu</span></label>')
+    html.append('<div class="hamburger-overlay" id="topbar-overlay">')
+    html.append('<label for="topbar-burger-toggle" class="overlay-backdrop"></label>')
+    html.append('<div class="hamburger-drawer">')
+    html.append('<div class="menu-header"><div class="title">Menu</div><label for="topbar-burger-toggle" class="close-btn" aria-label="Close"><span class="material-icons">close</span></label></div>')
+    html.append('<div class="menu-items">')
+    html.extend(tab_items)
+    html.append('</div></div></div>')
+
+    # Close topbar
+    html.append('</div>')
+    return "".join(html)
+
+
+@st.cache_data(show_spinner=False)
+def _render_subtabs(base_q: str, param: str, icons: Dict[str, str], active: str) -> str:
+    sub_html = ['<div class="subtabs">']
+    for name, icon_name in icons.items():
+        icon = f'<span class="material-icons">{icon_name}</span>'
+        cls = " sub-active" if active == name else ""
+        sub_html.append(
+            f'<a href="{base_q}&{param}={name.replace(" ", "%20")}" target="_self" class="subtab{cls}">{icon} {name}</a>'
         )
-    elif name == "Exit":
-        tab_items.append(f'<span class="tab-disabled" title="Exit">{icon}</span>')
-    else:
-        active_cls = " active" if st.session_state.active_tab == name else ""
-        tab_items.append(f'<span class="tab-disabled{active_cls}">{icon} {name}</span>')
-
-# Inline tabs row
-html.append('<div class="tabs" id="topbar-tabs">')
-html.extend(tab_items)
-html.append('</div>')
-
-# Burger toggle (CSS only) and overlay drawer menu
-html.append('<input type="checkbox" id="topbar-burger-toggle" class="burger-toggle" />')
-html.append('<label for="topbar-burger-toggle" class="burger" id="topbar-burger" aria-label="Menu"><span class="material-icons">menu</span></label>')
-html.append('<div class="hamburger-overlay" id="topbar-overlay">')
-html.append('<label for="topbar-burger-toggle" class="overlay-backdrop"></label>')
-html.append('<div class="hamburger-drawer">')
-html.append('<div class="menu-header"><div class="title">Menu</div><label for="topbar-burger-toggle" class="close-btn" aria-label="Close"><span class="material-icons">close</span></label></div>')
-html.append('<div class="menu-items">')
-html.extend(tab_items)
-html.append('</div></div></div>')
-
-# Close topbar
-html.append('</div>')
+    sub_html.append('</div>')
+    return "".join(sub_html)
+
+
+# CPE card fields, one tuple of (label, value) rows per column
+ONT_CARD_KV_COLUMNS = (
+    (("ID", "62756"), ("Phone", "7701234567"), ("ONT Model", "844G"), ("Package", "Employee-1"), ("Expiration", "2026-12-31 23:59:50")),
+    (("OLT", "NTWK-Sul-Pasha-OLT-00"), ("ONT ID", "{ont_id}"), ("Serial", "CXNK00000000"), ("MAC", "ccbe.5991.0000"), ("Line Card", "Cisco NCS 5500")),
+    (("Operational Status", "enable"), ("Status", "Online"), ("IP", "10.49.72.000"), ("VLAN", "3021"), ("GPON", "2.5G/1.25G")),
+)
+_KV_ROW_HTML = '<div class="kv-row"><div class="kv-label">{}</div><div class="kv-value">{}</div></div>'
+_KV_SEP_HTML = '<div class="kv-sep"></div>'
+_ONT_CARD_KV_HTML = "".join(
+    '<div class="kv-list">' + _KV_SEP_HTML.join(_KV_ROW_HTML.format(label, value) for label, value in rows) + '</div>'
+    for rows in ONT_CARD_KV_COLUMNS
+)
+
+# CPE card action buttons as (material icon, label); all disabled for now
+ONT_CARD_ACTIONS = (
+    ("settings_remote", "Remote Access"),
+    ("restart_alt", "Restart Session"),
+    ("remove_circle", "Unblock"),
+    ("description", "Request"),
+    ("public", "Public Ip"),
+    ("credit_card", "Recharge"),
+    ("undo", "Undo Recharge"),
+    ("near_me", "Transfer"),
+    ("find_replace", "Replace"),
+    ("highlight_off", "Un-Assign"),
+)
+_ACTION_BTN_HTML = '<span class="cpe-btn cpe-btn-disabled" title="Disabled"><span class="material-icons">{}</span> {}</span>'
+_ONT_CARD_ACTIONS_HTML = "".join(_ACTION_BTN_HTML.format(icon, label) for icon, label in ONT_CARD_ACTIONS)
+
+# CPE card on the client page; only the ONT id varies, so the markup is a constant template
+ONT_CARD_TEMPLATE = """
+    <div class="exp-card">
+        <details open>
+            <summary>#62000 - ccbe.5991.0000 - {ont_id} - Employee-1 - <span class="dt-green">2026-12-31 23:59:50</span></summary>
+            <div class="cpe-actions">
+                """ + _ONT_CARD_ACTIONS_HTML + """
+            </div>
+            <div class="exp-content">
+                <div class="kv-cols">""" + _ONT_CARD_KV_HTML + """</div>
+            </div>
+        </details>
+    </div>
+"""
+
+
+# Static stretches of the card around each {ont_id}, split once at import
+_ONT_CARD_PARTS = tuple(ONT_CARD_TEMPLATE.split("{ont_id}"))
+
+
+# The card is the same for every session, and a str is immutable, so share one copy per ONT id
+@st.cache_resource(show_spinner=False, max_entries=2048)
+def _render_ont_card(ont_id: str) -> str:
+    return ont_id.join(_ONT_CARD_PARTS)
+
+
+# Fallback page body for unknown tabs; static, so it skips the markdown parser st.write uses.
+# The heading stays an st.title, for the theme's heading style and anchor link.
+SPLASH_HTML = "<p>This is a prototype application.</p>"
+
 
 # Render topbar
-st.markdown("".join(html), unsafe_allow_html=True)
+st.markdown(_render_topbar(st.session_state.active_tab), unsafe_allow_html=True)
 
 # Main content area
 if st.session_state.active_tab == "Home":
@@ -581,10 +1115,6 @@ elif st.session_state.active_tab == "Client":
             selected_client_id = None
     
     if selected_client_id is None:
-        # Client page subtabs (Clients / Client Tags)
-        CLIENT_PAGE_SUBTAB_ICONS = {"Clients": "group", "Client Tags": "label"}
-        CLIENT_PAGE_SUBTAB_NAMES = list(CLIENT_PAGE_SUBTAB_ICONS.keys())
-        
         # Initialize active subtab
         if "active_client_page_subtab" not in st.session_state:
             st.session_state.active_client_page_subtab = "Clients"
@@ -592,20 +1122,14 @@ elif st.session_state.active_tab == "Client":
         # Allow switch via query param
         if "client_subtab" in st.query_params:
             q = st.query_params["client_subtab"]
-            if q in CLIENT_PAGE_SUBTAB_NAMES:
+            if q in _VALID_CLIENT_PAGE_SUBTABS:
                 st.session_state.active_client_page_subtab = q
         
         # Build subtabs HTML
-        base_tab_q = "?tab=Client"
-        sub_html = ['<div class="subtabs">']
-        for name in CLIENT_PAGE_SUBTAB_NAMES:
-            icon = f'<span class="material-icons">{CLIENT_PAGE_SUBTAB_ICONS[name]}</span>'
-            cls = " sub-active" if st.session_state.active_client_page_subtab == name else ""
-            sub_html.append(
-                f'<a href="{base_tab_q}&client_subtab={name.replace(" ", "%20")}" target="_self" class="subtab{cls}">{icon} {name}</a>'
-            )
-        sub_html.append('</div>')
-        st.markdown("".join(sub_html), unsafe_allow_html=True)
+        st.markdown(
+            _render_subtabs("?tab=Client", "client_subtab", CLIENT_PAGE_SUBTAB_ICONS, st.session_state.active_client_page_subtab),
+            unsafe_allow_html=True,
+        )
 
         # Content based on active subtab
         if st.session_state.active_client_page_subtab == "Clients":
@@ -631,42 +1155,12 @@ elif st.session_state.active_tab == "Client":
                 </div>
             """, unsafe_allow_html=True)
         
-            # Fetch clients
-            clients_df = fetch_clients()
+            # Fetch clients, each with its tags already aggregated
+            clients_view = fetch_clients_with_tags()
         
-            if clients_df.empty:
+            if clients_view.empty:
                 st.info("No clients found in the database.")
             else:
-                # Fetch all client tags to merge with clients
-                all_tags_df = fetch_client_tags_dataframe()
-            
-                # Group tags by client_id to get all tags for each client
-                if not all_tags_df.empty:
-                    # Create a mapping of client_id to list of tag info (display_name, color)
-                    client_tags_map = {}
-                    for _, tag_row in all_tags_df.iterrows():
-                        cid = tag_row.get('client_id')
-                        if cid not in client_tags_map:
-                            client_tags_map[cid] = []
-                        client_tags_map[cid].append({
-                            'display_name': tag_row.get('display_name', ''),
-                            'color': tag_row.get('color', '#6b7280')
-                        })
-                else:
-                    client_tags_map = {}
-            
-                # Prepare grid - add tag column
-                clients_view = clients_df.copy()
-            
-                # Add tags column
-                clients_view['tags'] = clients_view['client_id'].apply(
-                    lambda cid: client_tags_map.get(cid, [])
-                )
-            
-                # Remove ONT ID column
-                if 'ont_id' in clients_view.columns:
-                    clients_view = clients_view.drop(columns=['ont_id'])
-            
                 # Build AG Grid
                 gb = GridOptionsBuilder.from_dataframe(clients_view, enableRowGroup=False, enableValue=False, enablePivot=False)
             
@@ -846,10 +1340,6 @@ elif st.session_state.active_tab == "Client":
                         st.rerun()
 
         elif st.session_state.active_client_page_subtab == "Client Tags":
-            # Second-level tabs for Client Tags subtab (Dashboard / Settings)
-            CLIENT_TAGS_SUBTAB_ICONS = {"Dashboard": "dashboard", "Settings": "settings"}
-            CLIENT_TAGS_SUBTAB_NAMES = list(CLIENT_TAGS_SUBTAB_ICONS.keys())
-
             # initialize active_subtab for Client Tags (default: Dashboard)
             if "active_client_tags_subtab" not in st.session_state:
                 st.session_state.active_client_tags_subtab = "Dashboard"
@@ -857,33 +1347,28 @@ elif st.session_state.active_tab == "Client":
             # allow switch via query param
             if "client_tags_subtab" in st.query_params:
                 q = st.query_params["client_tags_subtab"]
-                if q in CLIENT_TAGS_SUBTAB_NAMES:
+                if q in _VALID_CLIENT_TAGS_SUBTABS:
                     st.session_state.active_client_tags_subtab = q
 
             # build subtabs HTML for Client Tags
-            base_tab_q = "?tab=Client&client_subtab=Client%20Tags"
-            sub_html = ['<div class="subtabs">']
-            for name in CLIENT_TAGS_SUBTAB_NAMES:
-                icon = f'<span class="material-icons">{CLIENT_TAGS_SUBTAB_ICONS[name]}</span>'
-                cls = " sub-active" if st.session_state.active_client_tags_subtab == name else ""
-                sub_html.append(
-                    f'<a href="{base_tab_q}&client_tags_subtab={name.replace(" ", "%20")}" target="_self" class="subtab{cls}">{icon} {name}</a>'
-                )
-            sub_html.append('</div>')
-            st.markdown("".join(sub_html), unsafe_allow_html=True)
+            st.markdown(
+                _render_subtabs(
+                    "?tab=Client&client_subtab=Client%20Tags", "client_tags_subtab",
+                    CLIENT_TAGS_SUBTAB_ICONS, st.session_state.active_client_tags_subtab,
+                ),
+                unsafe_allow_html=True,
+            )
 
             # Content based on active subtab
             if st.session_state.active_client_tags_subtab == "Dashboard":
-                # Fetch auto tag statistics for chart
-                stats_df = fetch_auto_tag_statistics()
+                # All dashboard frames come back from one pipelined round-trip
+                dashboard = fetch_dashboard_bundle()
+                auto_bounds = dashboard["auto_bounds"]
         
-                if not stats_df.empty:
-                    # Convert date column to datetime for proper handling
-                    stats_df['date'] = pd.to_datetime(stats_df['date'])
-            
+                if not auto_bounds.empty:
                     # Get min and max dates
-                    min_date = stats_df['date'].min()
-                    max_date = stats_df['date'].max()
+                    min_date = pd.Timestamp(auto_bounds['min_date'].iloc[0])
+                    max_date = pd.Timestamp(auto_bounds['max_date'].iloc[0])
             
                     # Calculate default date range (last 7 days)
                     default_start = max_date - pd.Timedelta(days=6)
@@ -893,82 +1378,84 @@ elif st.session_state.active_tab == "Client":
                     # Add section header
                     st.subheader("Automatic Tag Assignment History")
             
-                    with st.container(border=True):
-                        # Add filters row with tag filter and date slider
-                        col1, col2 = st.columns([1, 2])
+                    # Moving the slider or changing the tag only reruns this chart
+                    @st.fragment
+                    def assignment_history_chart():
+                        with st.container(border=True):
+                            # Add filters row with tag filter and date slider
+                            col1, col2 = st.columns([1, 2])
                 
-                        with col1:
-                            # Get unique tag names for filter
-                            tag_names = sorted(stats_df['display_name'].unique().tolist())
-                            tag_options = ["All"] + tag_names
-                            selected_tag = st.selectbox(
-                                "Tag",
-                                options=tag_options,
-                                index=0,
-                                key="chart_tag_filter"
-                            )
+                            with col1:
+                                # Unique tag names for filter, already sorted in SQL
+                                tag_names = list(auto_bounds['tag_names'].iloc[0])
+                                tag_options = ["All"] + tag_names
+                                selected_tag = st.selectbox(
+                                    "Tag",
+                                    options=tag_options,
+                                    index=0,
+                                    key="chart_tag_filter"
+                                )
                 
-                        with col2:
-                            date_range = st.slider(
-                                "Date",
-                                min_value=min_date.date(),
-                                max_value=max_date.date(),
-                                value=(default_start.date(), max_date.date()),
-                                format="YYYY-MM-DD"
-                            )
+                            with col2:
+                                date_range = st.slider(
+                                    "Date",
+                                    min_value=min_date.date(),
+                                    max_value=max_date.date(),
+                                    value=(default_start.date(), max_date.date()),
+                                    format="YYYY-MM-DD"
+                                )
                 
-                        # Filter data based on selected tag
-                        if selected_tag != "All":
-                            filtered_stats = stats_df[stats_df['display_name'] == selected_tag]
-                        else:
-                            filtered_stats = stats_df.copy()
+                            # Only the selected date range is fetched (cached per range)
+                            filtered_stats = fetch_auto_tag_statistics(date_range[0], date_range[1])
                 
-                        # Filter data based on selected date range
-                        mask = (filtered_stats['date'].dt.date >= date_range[0]) & (filtered_stats['date'].dt.date <= date_range[1])
-                        filtered_stats = filtered_stats[mask]
+                            # Filter data based on selected tag
+                            if selected_tag != "All" and not filtered_stats.empty:
+                                filtered_stats = filtered_stats[filtered_stats['display_name'] == selected_tag]
                 
-                        if not filtered_stats.empty:
-                            # Get color mapping for each tag
-                            color_map = {}
-                            for _, row in filtered_stats[['display_name', 'color']].drop_duplicates().iterrows():
-                                if pd.notna(row['display_name']) and pd.notna(row['color']):
-                                    color_map[row['display_name']] = row['color']
+                            if not filtered_stats.empty:
+                                # Convert date column to datetime for proper handling
+                                filtered_stats = filtered_stats.assign(date=pd.to_datetime(filtered_stats['date']))
                     
-                            # Create Plotly figure
-                            fig = go.Figure()
+                                # Get color mapping for each tag
+                                tag_colors = filtered_stats[['display_name', 'color']].dropna().drop_duplicates()
+                                color_map = dict(zip(tag_colors['display_name'].to_numpy(), tag_colors['color'].to_numpy()))
                     
-                            # Add a line for each tag
-                            for tag_name in filtered_stats['display_name'].unique():
-                                tag_data = filtered_stats[filtered_stats['display_name'] == tag_name].sort_values('date')
-                                fig.add_trace(go.Scatter(
-                                    x=tag_data['date'],
-                                    y=tag_data['assigned_count'],
-                                    name=tag_name,
-                                    mode='lines+markers',
-                                    line=dict(color=color_map.get(tag_name, '#6b7280'), width=2),
-                                    marker=dict(size=6)
-                                ))
+                                # Create Plotly figure with a line for each tag, all traces passed at once
+                                by_tag = filtered_stats.sort_values('date', kind='stable').groupby('display_name', sort=False)
+                                fig = go.Figure(data=[
+                                    go.Scatter(
+                                        x=tag_data['date'],
+                                        y=tag_data['assigned_count'],
+                                        name=tag_name,
+                                        mode='lines+markers',
+                                        line=dict(color=color_map.get(tag_name, '#6b7280'), width=2),
+                                        marker=dict(size=6)
+                                    )
+                                    for tag_name, tag_data in by_tag
+                                ])
                     
-                            # Update layout with legend on the right
-                            fig.update_layout(
-                                height=350,
-                                margin=dict(l=0, r=0, t=20, b=0),
-                                legend=dict(
-                                    orientation="v",
-                                    yanchor="top",
-                                    y=1,
-                                    xanchor="left",
-                                    x=1.02,
-                                    font=dict(size=14),
-                                    itemwidth=30
-                                ),
-                                xaxis_title="Date",
-                                yaxis_title="Assigned Count",
-                                hovermode='x unified'
-                            )
+                                # Update layout with legend on the right
+                                fig.update_layout(
+                                    height=350,
+                                    margin=dict(l=0, r=0, t=20, b=0),
+                                    legend=dict(
+                                        orientation="v",
+                                        yanchor="top",
+                                        y=1,
+                                        xanchor="left",
+                                        x=1.02,
+                                        font=dict(size=14),
+                                        itemwidth=30
+                                    ),
+                                    xaxis_title="Date",
+                                    yaxis_title="Assigned Count",
+                                    hovermode='x unified'
+                                )
+                    
+                                # Display the chart with hidden modebar
+                                st.plotly_chart(fig, width='stretch', config={'displayModeBar': False})
                     
-                            # Display the chart with hidden modebar
-                            st.plotly_chart(fig, width='stretch', config={'displayModeBar': False})
+                    assignment_history_chart()
             
                     # Add two charts side by side below
                     chart_col1, chart_col2 = st.columns(2)
@@ -979,13 +1466,11 @@ elif st.session_state.active_tab == "Client":
                 
                         with st.container(border=True):
                             # Vertical bar chart for last day's assignment counts
-                            # Get the last date from stats_df
-                            last_date = stats_df['date'].max()
-                            last_day_data = stats_df[stats_df['date'] == last_date].copy()
+                            # (already filtered to the last day and sorted by assigned_count in SQL)
+                            last_day_data = dashboard["auto_last_day"]
                     
                             if not last_day_data.empty:
-                                # Sort by assigned_count for better visualization
-                                last_day_data = last_day_data.sort_values('assigned_count', ascending=True)
+                                last_date = pd.to_datetime(last_day_data['date'].iloc[0])
                         
                                 # Create bar chart
                                 bar_fig = go.Figure()
@@ -1017,8 +1502,7 @@ elif st.session_state.active_tab == "Client":
                         st.subheader("Manual Tag Assignments")
                 
                         with st.container(border=True):
-                            # Fetch manual tag counts
-                            manual_tags_df = fetch_manual_tag_counts()
+                            manual_tags_df = dashboard["manual_counts"]
                     
                             if not manual_tags_df.empty:
                                 # Create bar chart
@@ -1048,295 +1532,252 @@ elif st.session_state.active_tab == "Client":
                             else:
                                 st.info("No manual tags found.")
         
-                # Fetch data
-                df = fetch_client_tags_dataframe()
+                df = dashboard["client_tags"]
         
                 if df.empty:
                     st.info("No client tags found in the database.")
                 else:
-                    # Add section header
-                    st.subheader("Client Tags")
-            
-                    # Placeholder for messages
-                    message_container = st.container()
-            
-                    # Add filter dropdown for Tag Type and Remove button
-                    col1, col2, col3 = st.columns([1, 1, 4])
-                    with col1:
-                        tag_type_filter = st.selectbox(
-                            "Tag Type",
-                            options=["All", "Automatic", "Manual"],
-                            index=0,
-                            key="tag_type_filter"
-                        )
+                    # Paging, filtering and selecting rows rerun only the grid; removing tags reruns
+                    # the whole app, so the assignment charts above pick up the new counts
+                    @st.fragment
+                    def client_tags_grid(df: pd.DataFrame):
+                        # Add section header
+                        st.subheader("Client Tags")
             
-                    # Create grid view - remove unwanted columns
-                    columns_to_remove = ["description", "color", "is_active", "tag_id", "system_name"]
-                    df_view = df.drop(columns=[col for col in columns_to_remove if col in df.columns], errors='ignore')
+                        # Placeholder for messages
+                        message_container = st.container()
             
-                    # Add a selection column at the beginning
-                    df_view.insert(0, "Select", "")
+                        # Add filter dropdown for Tag Type and Remove button
+                        col1, col2, col3 = st.columns([1, 1, 4])
+                        with col1:
+                            tag_type_filter = st.selectbox(
+                                "Tag Type",
+                                options=["All", "Automatic", "Manual"],
+                                index=0,
+                                key="tag_type_filter",
+                                on_change=lambda: st.session_state.pop("client_tags_page_cursors", None),
+                            )
             
-                    # Reorder columns - ont_id, client_id, display_name, tag_type
-                    desired_order = ["Select", "ont_id", "client_id", "display_name", "tag_type"]
-                    remaining_cols = [col for col in df_view.columns if col not in desired_order]
-                    new_order = [col for col in desired_order if col in df_view.columns] + remaining_cols
-                    df_view = df_view[new_order]
+                        # Keyset cursors of the pages visited so far; the last one starts the current page
+                        page_cursors = st.session_state.setdefault("client_tags_page_cursors", [None])
             
-                    # Map tag_type from codes to full names
-                    if "tag_type" in df_view.columns:
-                        tag_type_mapping = {"A": "Automatic", "M": "Manual"}
-                        df_view["tag_type"] = df_view["tag_type"].map(tag_type_mapping).fillna(df_view["tag_type"])
+                        # Apply tag type filter in Postgres, so only the matching rows are transferred.
+                        # The unfiltered first page already came with the dashboard bundle.
+                        tag_type_code = TAG_TYPE_CODES.get(tag_type_filter)
+                        if tag_type_code or page_cursors[-1] is not None:
+                            df = fetch_client_tags_page(tag_type_code, page_cursors[-1])
+                        has_next_page = len(df) > CLIENT_TAGS_PAGE_SIZE
+                        df = df.iloc[:CLIENT_TAGS_PAGE_SIZE]
             
-                    # Apply tag type filter
-                    if tag_type_filter != "All":
-                        df_view = df_view[df_view["tag_type"] == tag_type_filter]
+                        # Reuse the view and grid options built for an identical page. AgGrid stores the
+                        # serialized rows in them as rowData, so this skips re-encoding the rows too.
+                        grid_data_hash = hash(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+                        cached_grid = st.session_state.get("client_tags_dashboard_grid_options")
+                        if cached_grid is not None and cached_grid[0] == grid_data_hash:
+                            _, df_view, grid_options = cached_grid
+                        else:
+                            # Create grid view with only the rendered columns, in display order; AgGrid
+                            # serializes every column it gets, and df keeps tag_id for the Remove lookup
+                            columns_to_show = ["ont_id", "client_id", "display_name", "tag_type", "assigned_at", "assigned_by", "reason"]
+                            df_view = df[[col for col in columns_to_show if col in df.columns]].copy()
             
-                    # Build AG Grid
-                    gb = GridOptionsBuilder.from_dataframe(df_view, enableRowGroup=False, enableValue=False, enablePivot=False)
+                            # Add a selection column at the beginning
+                            df_view.insert(0, "Select", "")
             
-                    # Configure default column settings
-                    gb.configure_default_column(
-                        editable=False,
-                        resizable=True,
-                        filter=False,
-                        sortable=True,
-                        suppressMenu=True,
-                        menuTabs=[],
-                        suppressHeaderMenuButton=True,
-                    )
+                            # Map tag_type from codes to full names
+                            if "tag_type" in df_view.columns:
+                                df_view["tag_type"] = df_view["tag_type"].cat.rename_categories(TAG_TYPE_LABELS)
             
-                    # Configure selection - disable row click selection
-                    gb.configure_selection(
-                        selection_mode="multiple",
-                        use_checkbox=False,
-                        rowMultiSelectWithClick=False,
-                    )
+                            # Precompute the badge colors per row, so the renderer does no color math
+                            if "display_name" in df_view.columns and "color" in df.columns:
+                                df_view["_bg"] = df["color"]
+                                df_view["_fg"] = get_contrast_colors(df_view["_bg"])
+                        
+                            # Build AG Grid
+                            gb = GridOptionsBuilder.from_dataframe(df_view, enableRowGroup=False, enableValue=False, enablePivot=False)
             
-                    # Configure the Select column with checkboxes
-                    gb.configure_column(
-                        "Select",
-                        headerName="",
-                        pinned="left",
-                        checkboxSelection=True,
-                        headerCheckboxSelection=True,
-                        headerCheckboxSelectionFilteredOnly=False,
-                        sortable=False,
-                        filter=False,
-                        suppressMenu=True,
-                        menuTabs=[],
-                        suppressHeaderMenuButton=True,
-                        width=50,
-                        maxWidth=50,
-                    )
+                            # Configure default column settings
+                            gb.configure_default_column(
+                                editable=False,
+                                resizable=True,
+                                filter=False,
+                                sortable=True,
+                                suppressMenu=True,
+                                menuTabs=[],
+                                suppressHeaderMenuButton=True,
+                            )
             
-                    # Configure column headers
-                    column_headers = {
-                        "ont_id": "ONT ID",
-                        "client_id": "Client ID",
-                        "display_name": "Tag",
-                        "assigned_at": "Assigned At",
-                        "assigned_by": "Assigned By",
-                        "reason": "Reason",
-                        "tag_type": "Tag Type",
-                    }
+                            # Configure selection - disable row click selection
+                            gb.configure_selection(
+                                selection_mode="multiple",
+                                use_checkbox=False,
+                                rowMultiSelectWithClick=False,
+                            )
             
-                    for col, header in column_headers.items():
-                        if col in df_view.columns:
+                            # Configure the Select column with checkboxes
                             gb.configure_column(
-                                col, 
-                                headerName=header,
+                                "Select",
+                                headerName="",
+                                pinned="left",
+                                checkboxSelection=True,
+                                headerCheckboxSelection=True,
+                                headerCheckboxSelectionFilteredOnly=False,
+                                sortable=False,
                                 filter=False,
                                 suppressMenu=True,
                                 menuTabs=[],
                                 suppressHeaderMenuButton=True,
+                                width=50,
+                                maxWidth=50,
                             )
             
-                    # Configure display_name column with badge rendering using color from original df
-                    if "display_name" in df_view.columns:
-                        # Store color mapping in session state for the renderer
-                        color_map = {}
-                        if "display_name" in df.columns and "color" in df.columns:
-                            for _, row in df.iterrows():
-                                if pd.notna(row.get("display_name")) and pd.notna(row.get("color")):
-                                    color_map[str(row["display_name"])] = str(row["color"])
-                
-                        # Create color lookup string for JS using proper JSON encoding
-                        import json
-                        color_json = json.dumps(color_map)
-                
-                        color_renderer = JsCode(f"""
-                            class ColorBadgeRenderer {{
-                                init(params) {{
-                                    const colorMap = {color_json};
-                                    const displayName = params.data.display_name || '';
-                                    const color = colorMap[displayName] || '#6b7280';
-                            
-                                    // Function to determine if text should be black or white based on background
-                                    function getContrastColor(hexColor) {{
-                                        // Remove # if present
-                                        const hex = hexColor.replace('#', '');
-                                
-                                        // Convert to RGB
-                                        const r = parseInt(hex.substr(0, 2), 16);
-                                        const g = parseInt(hex.substr(2, 2), 16);
-                                        const b = parseInt(hex.substr(4, 2), 16);
-                                
-                                        // Calculate relative luminance using WCAG formula
-                                        const luminance = (0.299 * r + 0.587 * g + 0.114 * b) / 255;
-                                
-                                        // Return black for light backgrounds, white for dark backgrounds
-                                        return luminance > 0.5 ? '#000000' : '#ffffff';
-                                    }}
-                            
-                                    const textColor = getContrastColor(color);
-                            
-                                    this.eGui = document.createElement('span');
-                                    this.eGui.style.display = 'inline-block';
-                                    this.eGui.style.padding = '2px 8px';
-                                    this.eGui.style.borderRadius = '9999px';
-                                    this.eGui.style.backgroundColor = color;
-                                    this.eGui.style.color = textColor;
-                                    this.eGui.style.fontWeight = '600';
-                                    this.eGui.style.fontSize = '13px';
-                                    this.eGui.style.lineHeight = '1.3';
-                                    this.eGui.textContent = displayName;
-                                }}
-                                getGui() {{ return this.eGui; }}
-                            }}
-                        """)
-                        gb.configure_column("display_name", headerName="Tag", cellRenderer=color_renderer)
+                            # Configure column headers
+                            column_headers = {
+                                "ont_id": "ONT ID",
+                                "client_id": "Client ID",
+                                "display_name": "Tag",
+                                "assigned_at": "Assigned At",
+                                "assigned_by": "Assigned By",
+                                "reason": "Reason",
+                                "tag_type": "Tag Type",
+                            }
             
-                    # Enable pagination
-                    gb.configure_pagination(enabled=True, paginationAutoPageSize=False, paginationPageSize=10)
-                    gb.configure_grid_options(
-                        paginationPageSizeSelector=[10, 20, 50, 100],
-                        rowSelection='multiple',
-                        suppressRowDeselection=False,
-                    )
+                            for col, header in column_headers.items():
+                                if col in df_view.columns:
+                                    gb.configure_column(
+                                        col, 
+                                        headerName=header,
+                                        filter=False,
+                                        suppressMenu=True,
+                                        menuTabs=[],
+                                        suppressHeaderMenuButton=True,
+                                    )
             
-                    # Add auto-size on grid load and resize
-                    gb.configure_grid_options(
-                        onFirstDataRendered=JsCode("""
-                            function(params) {
-                                if (!params || !params.columnApi || !params.columnApi.autoSizeAllColumns) {
-                                    return;
-                                }
-                                const autoSize = () => {
-                                    try { params.columnApi.autoSizeAllColumns(); } catch (e) {}
-                                    try { params.api.resetRowHeights(); } catch (e) {}
-                                };
-                                window.requestAnimationFrame(autoSize);
-                                [0, 120, 400].forEach((delay) => {
-                                    window.setTimeout(autoSize, delay);
-                                });
-                            }
-                        """),
-                        onGridSizeChanged=JsCode("""
-                            function(params) {
-                                if (!params || !params.columnApi || !params.columnApi.autoSizeAllColumns) {
-                                    return;
-                                }
-                                const run = () => {
-                                    try { params.columnApi.autoSizeAllColumns(); } catch (e) {}
-                                    try { params.api.resetRowHeights(); } catch (e) {}
-                                };
-                                window.requestAnimationFrame(run);
-                                window.setTimeout(run, 150);
-                            }
-                        """),
-                        suppressRowClickSelection=True,
-                        suppressHeaderMenuButton=True,
-                        suppressColumnMenu=True,
-                        columnMenu="none",
-                    )
+                            # Configure display_name column with badge rendering
+                            if "display_name" in df_view.columns:
+                                gb.configure_column("display_name", headerName="Tag", cellRenderer=TAG_BADGE_RENDERER)
+                                gb.configure_column("_bg", hide=True)
+                                gb.configure_column("_fg", hide=True)
+            
+                            # Enable pagination
+                            gb.configure_pagination(enabled=True, paginationAutoPageSize=False, paginationPageSize=10)
+                            gb.configure_grid_options(
+                                paginationPageSizeSelector=[10, 20, 50, 100],
+                                rowSelection='multiple',
+                                suppressRowDeselection=False,
+                            )
+            
+                            # Add auto-size on grid load and resize
+                            gb.configure_grid_options(
+                                onFirstDataRendered=AUTOSIZE_ON_FIRST_DATA_RENDERED,
+                                onGridSizeChanged=AUTOSIZE_ON_GRID_SIZE_CHANGED,
+                                suppressRowClickSelection=True,
+                                suppressHeaderMenuButton=True,
+                                suppressColumnMenu=True,
+                                columnMenu="none",
+                            )
+            
+                            # Build grid options
+                            grid_options = gb.build()
             
-                    # Build grid options
-                    grid_options = gb.build()
+                            # Ensure column menu is disabled for all columns
+                            grid_options.setdefault("columnMenu", "none")
+                            default_col_def = grid_options.setdefault("defaultColDef", {})
+                            default_col_def["suppressMenu"] = True
+                            default_col_def["menuTabs"] = []
+                            default_col_def["suppressHeaderMenuButton"] = True
             
-                    # Ensure column menu is disabled for all columns
-                    grid_options.setdefault("columnMenu", "none")
-                    default_col_def = grid_options.setdefault("defaultColDef", {})
-                    default_col_def["suppressMenu"] = True
-                    default_col_def["menuTabs"] = []
-                    default_col_def["suppressHeaderMenuButton"] = True
+                            # Disable menu for all column definitions
+                            col_defs = grid_options.get("columnDefs", [])
+                            if isinstance(col_defs, list):
+                                for col_def in col_defs:
+                                    if isinstance(col_def, dict):
+                                        col_def["suppressMenu"] = True
+                                        col_def["menuTabs"] = []
+                                        col_def["suppressHeaderMenuButton"] = True
+                                        # For the checkbox selection column - only select current page
+                                        if col_def.get("checkboxSelection") == True:
+                                            col_def["lockPosition"] = "left"
+                                            col_def["headerCheckboxSelection"] = True
+                                            col_def["headerCheckboxSelectionCurrentPageOnly"] = True
             
-                    # Disable menu for all column definitions
-                    col_defs = grid_options.get("columnDefs", [])
-                    if isinstance(col_defs, list):
-                        for col_def in col_defs:
-                            if isinstance(col_def, dict):
-                                col_def["suppressMenu"] = True
-                                col_def["menuTabs"] = []
-                                col_def["suppressHeaderMenuButton"] = True
-                                # For the checkbox selection column - only select current page
-                                if col_def.get("checkboxSelection") == True:
-                                    col_def["lockPosition"] = "left"
-                                    col_def["headerCheckboxSelection"] = True
-                                    col_def["headerCheckboxSelectionCurrentPageOnly"] = True
+                            st.session_state["client_tags_dashboard_grid_options"] = (grid_data_hash, df_view, grid_options)
             
-                    # Add custom CSS for left-aligned pagination
-                    custom_css = {
-                        ".ag-paging-panel": {"justify-content": "flex-start !important"}
-                    }
+                        # Add custom CSS for left-aligned pagination
+                        custom_css = {
+                            ".ag-paging-panel": {"justify-content": "flex-start !important"}
+                        }
             
-                    # Initialize deletion counter for grid key management
-                    if 'dashboard_deletion_count' not in st.session_state:
-                        st.session_state.dashboard_deletion_count = 0
+                        # Initialize deletion counter for grid key management
+                        if 'dashboard_deletion_count' not in st.session_state:
+                            st.session_state.dashboard_deletion_count = 0
                     
-                    # Display grid with dynamic key that changes after deletions
-                    grid_key = f'client_tags_dashboard_grid_{st.session_state.dashboard_deletion_count}'
-                    grid_response = AgGrid(
-                        df_view,
-                        gridOptions=grid_options,
-                        height=520,
-                        fit_columns_on_grid_load=False,
-                        update_mode=GridUpdateMode.SELECTION_CHANGED,
-                        data_return_mode=DataReturnMode.AS_INPUT,
-                        allow_unsafe_jscode=True,
-                        theme="balham",
-                        custom_css=custom_css,
-                        key=grid_key,
-                        reload_data=False
-                    )
+                        # Display grid with dynamic key that changes after deletions
+                        grid_key = f'client_tags_dashboard_grid_{st.session_state.dashboard_deletion_count}'
+                        grid_response = AgGrid(
+                            df_view,
+                            gridOptions=grid_options,
+                            height=520,
+                            fit_columns_on_grid_load=False,
+                            update_mode=GridUpdateMode.SELECTION_CHANGED,
+                            data_return_mode=DataReturnMode.AS_INPUT,
+                            allow_unsafe_jscode=True,
+                            theme="balham",
+                            custom_css=custom_css,
+                            key=grid_key,
+                            reload_data=False
+                        )
             
-                    # Show remove button only if rows are selected
-                    selected_rows = grid_response.get("selected_rows", [])
-                    if selected_rows is not None and len(selected_rows) > 0:
-                        selected_count = len(selected_rows)
-                        with col2:
-                            st.markdown('<div style="padding-top: 26px;"></div>', unsafe_allow_html=True)
-                            if st.button(f"🗑️ Remove Selected ({selected_count})", key="remove_tags_button", type="primary"):
-                                # Get the original indices to find client_id and tag_id
-                                removed_count = 0
+                        # Page through the rows CLIENT_TAGS_PAGE_SIZE at a time. The cursors move in
+                        # on_click callbacks, so the grid's own rerun already shows the new page
+                        # (a later page can be empty, e.g. after removing all its rows: keep Previous)
+                        if df.empty and len(page_cursors) > 1:
+                            st.info("No client tags on this page.")
+                        if has_next_page or len(page_cursors) > 1:
+                            next_key = (int(df.iloc[-1]["client_id"]), int(df.iloc[-1]["tag_id"])) if has_next_page else None
+                            prev_col, next_col, _ = st.columns([1, 1, 4])
+                            with prev_col:
+                                st.button("◀ Previous", key="client_tags_prev_page", disabled=len(page_cursors) == 1,
+                                          on_click=page_cursors.pop)
+                            with next_col:
+                                st.button("Next ▶", key="client_tags_next_page", disabled=not has_next_page,
+                                          on_click=page_cursors.append, args=(next_key,))
+            
+                        # Show remove button only if rows are selected
+                        selected_rows = grid_response.get("selected_rows", [])
+                        if selected_rows is not None and len(selected_rows) > 0:
+                            selected_count = len(selected_rows)
+                            with col2:
+                                st.markdown('<div style="padding-top: 26px;"></div>', unsafe_allow_html=True)
+                                if st.button(f"🗑️ Remove Selected ({selected_count})", key="remove_tags_button", type="primary"):
+                                    # Get the original indices to find client_id and tag_id
+                                    removed_count = 0
                         
-                                # Convert selected_rows to DataFrame if it's not already
-                                if isinstance(selected_rows, pd.DataFrame):
-                                    selected_df = selected_rows
-                                else:
-                                    selected_df = pd.DataFrame(selected_rows)
+                                    # Convert selected_rows to DataFrame if it's not already
+                                    if isinstance(selected_rows, pd.DataFrame):
+                                        selected_df = selected_rows
+                                    else:
+                                        selected_df = pd.DataFrame(selected_rows)
                         
-                                for idx, selected_row in selected_df.iterrows():
-                                    # Find the matching row in the original dataframe
-                                    client_id = selected_row.get("client_id")
-                                    # Get tag_id from display_name by looking up in original df
-                                    display_name = selected_row.get("display_name")
-                            
-                                    if client_id and display_name:
-                                        # Find tag_id from original df
-                                        matching_rows = df[(df["client_id"] == client_id) & (df["display_name"] == display_name)]
-                                        if not matching_rows.empty:
-                                            tag_id = matching_rows.iloc[0]["tag_id"]
-                                            if remove_client_tag(client_id, tag_id):
-                                                removed_count += 1
+                                    # Join the selection to tag_id on the original df in one go, first match wins
+                                    tag_keys = df[["client_id", "display_name", "tag_id"]].drop_duplicates(["client_id", "display_name"])
+                                    selected_keys = selected_df.loc[selected_df["display_name"].fillna("") != "", ["client_id", "display_name"]]
+                                    matched = selected_keys.merge(tag_keys, on=["client_id", "display_name"])
+                                    rows_to_remove = matched[["client_id", "tag_id"]].to_dict("records")
                         
-                                if removed_count > 0:
-                                    # Increment deletion counter to reset grid selection
-                                    st.session_state.dashboard_deletion_count += 1
-                                    with message_container:
-                                        st.success(f"Removed {removed_count} tag(s)")
-                                    time.sleep(2)
-                                    st.rerun()
+                                    # One transaction for the whole selection
+                                    if remove_client_tags_bulk(rows_to_remove):
+                                        removed_count = len(rows_to_remove)
+                        
+                                    if removed_count > 0:
+                                        # Increment deletion counter to reset grid selection
+                                        st.session_state.dashboard_deletion_count += 1
+                                        with message_container:
+                                            st.success(f"Removed {removed_count} tag(s)")
+                                        time.sleep(2)
+                                        st.rerun()
+                    
+                    client_tags_grid(df)
             
             elif st.session_state.active_client_tags_subtab == "Settings":
                 # Show auto tag edit modal
@@ -1354,7 +1795,7 @@ elif st.session_state.active_tab == "Client":
                         new_display_name = st.text_input("Tag", value=tag_data['display_name'], key="auto_tag_name")
                         
                         # Description (read-only for automatic tags)
-                        st.text_area("Description", value=tag_data['description'] if pd.notna(tag_data['description']) else "", disabled=True, height=80, key="auto_tag_desc")
+                        st.text_area("Description", value=tag_data['description'], disabled=True, height=80, key="auto_tag_desc")
                         
                         new_color = st.color_picker("Color", value=tag_data['color'], key="auto_tag_color")
                         new_is_active = st.checkbox("Active", value=bool(tag_data['is_active']), key="auto_tag_active")
@@ -1368,11 +1809,12 @@ elif st.session_state.active_tab == "Client":
                         col1, col2 = st.columns(2)
                         with col1:
                             if st.button("Save", use_container_width=True, type="primary", key="save_auto_tag"):
+                                # Send only the edited fields; an unchanged tag needs no write at all
                                 success = update_tag_config(
                                     tag_id=int(tag_data['id']),
-                                    display_name=new_display_name,
-                                    color=new_color,
-                                    is_active=new_is_active
+                                    display_name=new_display_name if new_display_name != tag_data['display_name'] else None,
+                                    color=new_color if new_color != tag_data['color'] else None,
+                                    is_active=new_is_active if new_is_active != bool(tag_data['is_active']) else None
                                 )
                                 if success:
                                     message_placeholder.success(f"Updated {new_display_name}")
@@ -1399,7 +1841,7 @@ elif st.session_state.active_tab == "Client":
                             st.rerun()
                         
                         new_display_name = st.text_input("Tag", value=tag_data['display_name'], key="manual_tag_name")
-                        new_description = st.text_area("Description", value=tag_data['description'] if pd.notna(tag_data['description']) else "", height=80, key="manual_tag_desc")
+                        new_description = st.text_area("Description", value=tag_data['description'], height=80, key="manual_tag_desc")
                         new_color = st.color_picker("Color", value=tag_data['color'], key="manual_tag_color")
                         new_is_active = st.checkbox("Active", value=bool(tag_data['is_active']), key="manual_tag_active")
                         
@@ -1412,12 +1854,13 @@ elif st.session_state.active_tab == "Client":
                         col1, col2 = st.columns(2)
                         with col1:
                             if st.button("Save", use_container_width=True, type="primary", key="save_manual_tag"):
+                                # Send only the edited fields; an unchanged tag needs no write at all
                                 success = update_tag_config(
                                     tag_id=int(tag_data['id']),
-                                    display_name=new_display_name,
-                                    color=new_color,
-                                    is_active=new_is_active,
-                                    description=new_description
+                                    display_name=new_display_name if new_display_name != tag_data['display_name'] else None,
+                                    color=new_color if new_color != tag_data['color'] else None,
+                                    is_active=new_is_active if new_is_active != bool(tag_data['is_active']) else None,
+                                    description=new_description if new_description != tag_data['description'] else None
                                 )
                                 if success:
                                     message_placeholder.success(f"Updated {new_display_name}")
@@ -1437,89 +1880,11 @@ elif st.session_state.active_tab == "Client":
         
                 if not auto_tags_df.empty:
                     # Prepare grid data - add action column as FIRST column, keep color but hide it
-                    auto_grid_df = auto_tags_df[['id', 'display_name', 'color', 'is_active', 'description']].copy()
+                    auto_grid_df = auto_tags_df[['id', 'display_name', 'color', 'text_color', 'is_active', 'description']].copy()
                     auto_grid_df.insert(0, 'edit', '✏️')  # Edit emoji as first column
                     
-                    # Build AG Grid
-                    gb = GridOptionsBuilder.from_dataframe(auto_grid_df)
-                    
-                    gb.configure_default_column(
-                        editable=False,
-                        resizable=True,
-                        filter=False,
-                        sortable=False,
-                        suppressMenu=True,
-                    )
-                    
-                    # Configure edit button column (first column)
-                    gb.configure_column(
-                        "edit",
-                        headerName="",
-                        width=60,
-                        cellStyle={'textAlign': 'center', 'cursor': 'pointer', 'fontSize': '18px'},
-                        editable=False,
-                        pinned='left',
-                        suppressSizeToFit=True
-                    )
-                    
-                    # Configure Tag column with color background using cellStyle function
-                    gb.configure_column(
-                        "display_name", 
-                        headerName="Tag", 
-                        autoHeaderHeight=True, 
-                        wrapHeaderText=True,
-                        cellStyle=JsCode("""
-                            function(params) {
-                                const color = params.data.color;
-                                // Calculate contrasting text color
-                                const hex = color.replace('#', '');
-                                const r = parseInt(hex.substr(0, 2), 16);
-                                const g = parseInt(hex.substr(2, 2), 16);
-                                const b = parseInt(hex.substr(4, 2), 16);
-                                const luminance = (0.299 * r + 0.587 * g + 0.114 * b) / 255;
-                                const textColor = luminance > 0.5 ? '#000000' : '#ffffff';
-                                
-                                return {
-                                    'backgroundColor': color,
-                                    'color': textColor,
-                                    'fontWeight': '500',
-                                    'padding': '8px 12px',
-                                    'display': 'flex',
-                                    'alignItems': 'center',
-                                    'height': '100%'
-                                };
-                            }
-                        """)
-                    )
-                    
-                    # Hide color column (but keep it in data for styling)
-                    gb.configure_column("color", hide=True)
-                    
-                    # Configure other data columns
-                    gb.configure_column("is_active", headerName="Active", autoHeaderHeight=True, wrapHeaderText=True)
-                    gb.configure_column("description", headerName="Description", flex=1, autoHeaderHeight=True, wrapHeaderText=True)
-                    
-                    # Hide ID column but keep it in data
-                    gb.configure_column("id", hide=True)
-                    
-                    # Disable selection completely
-                    gb.configure_selection(selection_mode=None, use_checkbox=False)
-                    
-                    # Configure cell clicked event to only select on edit column
-                    gb.configure_grid_options(
-                        onCellClicked=JsCode("""
-                            function(params) {
-                                if (params.column.colId === 'edit') {
-                                    params.api.deselectAll();
-                                    params.node.setSelected(true);
-                                }
-                            }
-                        """),
-                        suppressRowClickSelection=True,
-                        rowSelection='single'
-                    )
-                    
-                    grid_options = gb.build()
+                    # Build AG Grid (options depend only on the columns)
+                    grid_options = _build_tag_config_grid_options(auto_grid_df.iloc[:0])
                     
                     # Calculate dynamic height based on row count
                     row_height = 42
@@ -1616,89 +1981,11 @@ elif st.session_state.active_tab == "Client":
         
                 if not manual_tags_df.empty:
                     # Prepare grid data - add action column as FIRST column, keep color but hide it
-                    manual_grid_df = manual_tags_df[['id', 'display_name', 'color', 'is_active', 'description']].copy()
+                    manual_grid_df = manual_tags_df[['id', 'display_name', 'color', 'text_color', 'is_active', 'description']].copy()
                     manual_grid_df.insert(0, 'edit', '✏️')  # Edit emoji as first column
                     
-                    # Build AG Grid
-                    gb = GridOptionsBuilder.from_dataframe(manual_grid_df)
-                    
-                    gb.configure_default_column(
-                        editable=False,
-                        resizable=True,
-                        filter=False,
-                        sortable=False,
-                        suppressMenu=True,
-                    )
-                    
-                    # Configure edit button column (first column)
-                    gb.configure_column(
-                        "edit",
-                        headerName="",
-                        width=60,
-                        cellStyle={'textAlign': 'center', 'cursor': 'pointer', 'fontSize': '18px'},
-                        editable=False,
-                        pinned='left',
-                        suppressSizeToFit=True
-                    )
-                    
-                    # Configure Tag column with color background using cellStyle function
-                    gb.configure_column(
-                        "display_name", 
-                        headerName="Tag", 
-                        autoHeaderHeight=True, 
-                        wrapHeaderText=True,
-                        cellStyle=JsCode("""
-                            function(params) {
-                                const color = params.data.color;
-                                // Calculate contrasting text color
-                                const hex = color.replace('#', '');
-                                const r = parseInt(hex.substr(0, 2), 16);
-                                const g = parseInt(hex.substr(2, 2), 16);
-                                const b = parseInt(hex.substr(4, 2), 16);
-                                const luminance = (0.299 * r + 0.587 * g + 0.114 * b) / 255;
-                                const textColor = luminance > 0.5 ? '#000000' : '#ffffff';
-                                
-                                return {
-                                    'backgroundColor': color,
-                                    'color': textColor,
-                                    'fontWeight': '500',
-                                    'padding': '8px 12px',
-                                    'display': 'flex',
-                                    'alignItems': 'center',
-                                    'height': '100%'
-                                };
-                            }
-                        """)
-                    )
-                    
-                    # Hide color column (but keep it in data for styling)
-                    gb.configure_column("color", hide=True)
-                    
-                    # Configure other data columns
-                    gb.configure_column("is_active", headerName="Active", autoHeaderHeight=True, wrapHeaderText=True)
-                    gb.configure_column("description", headerName="Description", flex=1, autoHeaderHeight=True, wrapHeaderText=True)
-                    
-                    # Hide ID column but keep it in data
-                    gb.configure_column("id", hide=True)
-                    
-                    # Disable selection completely
-                    gb.configure_selection(selection_mode=None, use_checkbox=False)
-                    
-                    # Configure cell clicked event to only select on edit column
-                    gb.configure_grid_options(
-                        onCellClicked=JsCode("""
-                            function(params) {
-                                if (params.column.colId === 'edit') {
-                                    params.api.deselectAll();
-                                    params.node.setSelected(true);
-                                }
-                            }
-                        """),
-                        suppressRowClickSelection=True,
-                        rowSelection='single'
-                    )
-                    
-                    grid_options = gb.build()
+                    # Build AG Grid (options depend only on the columns)
+                    grid_options = _build_tag_config_grid_options(manual_grid_df.iloc[:0])
                     
                     # Calculate dynamic height based on row count
                     row_height = 42
@@ -1737,132 +2024,121 @@ elif st.session_state.active_tab == "Client":
     else:
         # Show client detail page
         # Client page layout: two columns
-        st.markdown('<div id="client-layout">', unsafe_allow_html=True)
-        
-        # Add back button
-        if st.button("← Back to Client List"):
-            st.query_params.clear()
-            st.query_params["tab"] = "Client"
-            st.rerun()
+        # Keyed container so the layout CSS can target it (.st-key-client-layout)
+        with st.container(key="client-layout"):
+            # Add back button
+            if st.button("← Back to Client List"):
+                st.query_params.clear()
+                st.query_params["tab"] = "Client"
+                st.rerun()
         
-        left, right = st.columns([2, 5], gap="large")
-        with left:
-            # Fetch client data from database
-            client_id = selected_client_id
-            clients_df = fetch_clients()
-            client_data = clients_df[clients_df['client_id'] == client_id]
+            left, right = st.columns([2, 5], gap="large")
+            with left:
+                # Fetch client data from database
+                client_id = selected_client_id
+                clients_df = fetch_clients()
+                client_data = clients_df[clients_df['client_id'] == client_id]
             
-            if client_data.empty:
-                st.error(f"Client #{client_id} not found")
-                st.stop()
+                if client_data.empty:
+                    st.error(f"Client #{client_id} not found")
+                    st.stop()
             
-            client_row = client_data.iloc[0]
+                client_row = client_data.iloc[0]
             
-            # Display client name as header
-            client_name = client_row.get('name', 'Unknown Client')
-            st.subheader(client_name)
+                # Display client name as header
+                client_name = client_row.get('name', 'Unknown Client')
+                st.subheader(client_name)
             
-            # Build client rows with dynamic data
-            client_type = client_row.get('type', '')
-            phone = client_row.get('phone', '')
-            sip_value = client_row.get('sip', '')
-            sip_display = sip_value if sip_value else "This Client has no Sip."
+                # Build client rows with dynamic data
+                client_type = client_row.get('type', '')
+                phone = client_row.get('phone', '')
+                sip_value = client_row.get('sip', '')
+                sip_display = sip_value if sip_value else "This Client has no Sip."
+            
+                client_rows = [
+                    ("ID", str(client_id)),
+                    ("Client Type", client_type),
+                    ("Account Number", phone),
+                    ("Service ID", ""),
+                    ("Sip", sip_display),
+                ]
+
+                # Render first set of rows (before Tags)
+                for idx, (lbl, val) in enumerate(client_rows):
+                    lcol, vcol = st.columns([1, 2], gap="small")
+                    with lcol:
+                        st.caption(lbl)
+                    with vcol:
+                        st.write(val or "—")
+                    st.markdown('<hr style="margin:0;border:0;border-top:1px solid rgba(0,0,0,0.10);" />', unsafe_allow_html=True)
             
-            client_rows = [
-                ("ID", str(client_id)),
-                ("Client Type", client_type),
-                ("Account Number", phone),
-                ("Service ID", ""),
-                ("Sip", sip_display),
-            ]
-
-            # Render first set of rows (before Tags)
-            for idx, (lbl, val) in enumerate(client_rows):
+                # Tags section
                 lcol, vcol = st.columns([1, 2], gap="small")
                 with lcol:
-                    st.caption(lbl)
+                    st.caption("Tags")
                 with vcol:
-                    st.write(val or "—")
-                st.markdown('<hr style="margin:0;border:0;border-top:1px solid rgba(0,0,0,0.10);" />', unsafe_allow_html=True)
-            
-            # Tags section
-            lcol, vcol = st.columns([1, 2], gap="small")
-            with lcol:
-                st.caption("Tags")
-            with vcol:
-                # Fetch tags for this client
-                client_tags_df = fetch_client_tags(client_id)
+                    # Fetch tags for this client
+                    client_tags_df = fetch_client_tags(client_id)
                 
-                # Track if we need to show a message
-                tag_message = None
-                tag_message_type = None
+                    # Track if we need to show a message
+                    tag_message = None
+                    tag_message_type = None
                 
-                if not client_tags_df.empty:
-                    # Display existing tags as colored badges without remove buttons
-                    for idx, tag_row in client_tags_df.iterrows():
-                        tag_color = tag_row.get('color', '#6b7280')
-                        tag_name = tag_row.get('display_name', 'Unknown')
-                        text_color = get_contrast_color(tag_color)
-                        
-                        st.markdown(
-                            f'<span style="display:inline-block;background:{tag_color};color:{text_color};'
-                            f'padding:4px 10px;border-radius:12px;font-size:14px;margin-bottom:4px;">{tag_name}</span>',
-                            unsafe_allow_html=True
+                    if not client_tags_df.empty:
+                        # Display existing tags as colored badges without remove buttons, all in one element.
+                        # Tag names (and colors) are user-editable in Settings: escape them, so they stay text
+                        st.html(
+                            '<div style="display:flex;flex-direction:column;align-items:flex-start;gap:4px;">'
+                            + "".join(
+                                f'<span style="display:inline-block;background:{html.escape(str(tag_row.color))};'
+                                f'color:{tag_row.text_color};padding:4px 10px;border-radius:12px;font-size:14px;">'
+                                f'{html.escape(str(tag_row.display_name))}</span>'
+                                for tag_row in client_tags_df.itertuples(index=False)
+                            )
+                            + '</div>'
                         )
-                else:
-                    st.write("—")
+                    else:
+                        st.write("—")
             
-            st.markdown('<hr style="margin:0;border:0;border-top:1px solid rgba(0,0,0,0.10);" />', unsafe_allow_html=True)
+                st.markdown('<hr style="margin:0;border:0;border-top:1px solid rgba(0,0,0,0.10);" />', unsafe_allow_html=True)
             
-            # Remaining rows (after Tags) - use dynamic data
-            city = client_row.get('city', '')
-            address = client_row.get('address', '')
+                # Remaining rows (after Tags) - use dynamic data
+                city = client_row.get('city', '')
+                address = client_row.get('address', '')
             
-            remaining_rows = [
-                ("City", city),
-                ("Address", address),
-                ("Comment", ""),
-                ("Created At", ""),
-                ("Last Change", ""),
-            ]
+                remaining_rows = [
+                    ("City", city),
+                    ("Address", address),
+                    ("Comment", ""),
+                    ("Created At", ""),
+                    ("Last Change", ""),
+                ]
             
-            for idx, (lbl, val) in enumerate(remaining_rows):
-                lcol, vcol = st.columns([1, 2], gap="small")
-                with lcol:
-                    st.caption(lbl)
-                with vcol:
-                    st.write(val or "—")
-                # Compact separator between rows (skip after the last row)
-                if idx < len(remaining_rows) - 1:
-                    st.markdown('<hr style="margin:0;border:0;border-top:1px solid rgba(0,0,0,0.10);" />', unsafe_allow_html=True)
+                for idx, (lbl, val) in enumerate(remaining_rows):
+                    lcol, vcol = st.columns([1, 2], gap="small")
+                    with lcol:
+                        st.caption(lbl)
+                    with vcol:
+                        st.write(val or "—")
+                    # Compact separator between rows (skip after the last row)
+                    if idx < len(remaining_rows) - 1:
+                        st.markdown('<hr style="margin:0;border:0;border-top:1px solid rgba(0,0,0,0.10);" />', unsafe_allow_html=True)
         
-        with right:
-                # Replace Streamlit tabs with HTML subtabs similar to "Call Tickets"
-                CLIENT_SUBTAB_ICONS = {
-                    "CPEs": "router",
-                    "Tags": "label",
-                    "Assign": "assignment_turned_in",
-                    "SIP": "dialer_sip",
-                    "Client Operations": "assignment",
-                    "Client Attachments": "attachment",
-                    "Client Attachments KYC": "fingerprint",
-                }
-                CLIENT_SUBTAB_NAMES = list(CLIENT_SUBTAB_ICONS.keys())
-
-                # initialize active client subtab
-                if "active_client_subtab" not in st.session_state:
-                    st.session_state.active_client_subtab = "CPEs"
+            with right:
+                # initialize active client subtab; it persists across reruns, so read it once here
+                current = st.session_state.setdefault("active_client_subtab", "CPEs")
                 # allow switch via query param only when on Client tab
                 if st.session_state.active_tab == "Client" and "client_subtab" in st.query_params:
                     cq = st.query_params["client_subtab"]
-                    if cq in CLIENT_SUBTAB_NAMES:
-                        st.session_state.active_client_subtab = cq
+                    if cq in _VALID_CLIENT_SUBTABS:
+                        st.session_state.active_client_subtab = current = cq
 
+                # Replace Streamlit tabs with HTML subtabs similar to "Call Tickets"
                 base_q = f"?tab=Client&client_id={client_id}"
                 sub_html = ['<div class="subtabs" style="margin-left:12px;">']
-                for i, name in enumerate(CLIENT_SUBTAB_NAMES):
+                for i, name in enumerate(CLIENT_SUBTAB_ICONS):
                     icon = f'<span class="material-icons">{CLIENT_SUBTAB_ICONS[name]}</span>'
-                    cls = " sub-active" if st.session_state.active_client_subtab == name else ""
+                    cls = " sub-active" if current == name else ""
                     if name in ["CPEs", "Tags"]:
                         # CPEs and Tags tabs are clickable
                         extra_cls = " tags-subtab" if name == "Tags" else ""
@@ -1878,114 +2154,64 @@ elif st.session_state.active_tab == "Client":
                 st.markdown("".join(sub_html), unsafe_allow_html=True)
 
                 # Right column content based on active client subtab
-                current = st.session_state.active_client_subtab
-                if current == "CPEs":
+                def cpes_subtab():
                     ont_id = "7701234567"
-                    st.markdown(
-                        f"""
-                        <div class="exp-card">
-                            <details open>
-                                <summary>#62000 - ccbe.5991.0000 - {ont_id} - Employee-1 - <span class="dt-green">2026-12-31 23:59:50</span></summary>
-                                <div class="cpe-actions">
-                                    <span class="cpe-btn cpe-btn-disabled" title="Disabled"><span class="material-icons">settings_remote</span> Remote Access</span>
-                                    <span class="cpe-btn cpe-btn-disabled" title="Disabled"><span class="material-icons">restart_alt</span> Restart Session</span>
-                                    <span class="cpe-btn cpe-btn-disabled" title="Disabled"><span class="material-icons">remove_circle</span> Unblock</span>
-                                    <span class="cpe-btn cpe-btn-disabled" title="Disabled"><span class="material-icons">description</span> Request</span>
-                                    <span class="cpe-btn cpe-btn-disabled" title="Disabled"><span class="material-icons">public</span> Public Ip</span>
-                                    <span class="cpe-btn cpe-btn-disabled" title="Disabled"><span class="material-icons">credit_card</span> Recharge</span>
-                                    <span class="cpe-btn cpe-btn-disabled" title="Disabled"><span class="material-icons">undo</span> Undo Recharge</span>
-                                    <span class="cpe-btn cpe-btn-disabled" title="Disabled"><span class="material-icons">near_me</span> Transfer</span>
-                                    <span class="cpe-btn cpe-btn-disabled" title="Disabled"><span class="material-icons">find_replace</span> Replace</span>
-                                    <span class="cpe-btn cpe-btn-disabled" title="Disabled"><span class="material-icons">highlight_off</span> Un-Assign</span>
-                                </div>
-                                <div class="exp-content">
-                                    <div class="kv-cols">
-                                        <div class="kv-list">
-                                            <div class="kv-row"><div class="kv-label">ID</div><div class="kv-value">62756</div></div>
-                                            <div class="kv-sep"></div>
-                                            <div class="kv-row"><div class="kv-label">Phone</div><div class="kv-value">7701234567</div></div>
-                                            <div class="kv-sep"></div>
-                                            <div class="kv-row"><div class="kv-label">ONT Model</div><div class="kv-value">844G</div></div>
-                                            <div class="kv-sep"></div>
-                                            <div class="kv-row"><div class="kv-label">Package</div><div class="kv-value">Employee-1</div></div>
-                                            <div class="kv-sep"></div>
-                                            <div class="kv-row"><div class="kv-label">Expiration</div><div class="kv-value">2026-12-31 23:59:50</div></div>
-                                        </div>
-                                        <div class="kv-list">
-                                            <div class="kv-row"><div class="kv-label">OLT</div><div class="kv-value">NTWK-Sul-Pasha-OLT-00</div></div>
-                                            <div class="kv-sep"></div>
-                                            <div class="kv-row"><div class="kv-label">ONT ID</div><div class="kv-value">{ont_id}</div></div>
-                                            <div class="kv-sep"></div>
-                                            <div class="kv-row"><div class="kv-label">Serial</div><div class="kv-value">CXNK00000000</div></div>
-                                            <div class="kv-sep"></div>
-                                            <div class="kv-row"><div class="kv-label">MAC</div><div class="kv-value">ccbe.5991.0000</div></div>
-                                            <div class="kv-sep"></div>
-                                            <div class="kv-row"><div class="kv-label">Line Card</div><div class="kv-value">Cisco NCS 5500</div></div>
-                                        </div>
-                                        <div class="kv-list">
-                                            <div class="kv-row"><div class="kv-label">Operational Status</div><div class="kv-value">enable</div></div>
-                                            <div class="kv-sep"></div>
-                                            <div class="kv-row"><div class="kv-label">Status</div><div class="kv-value">Online</div></div>
-                                            <div class="kv-sep"></div>
-                                            <div class="kv-row"><div class="kv-label">IP</div><div class="kv-value">10.49.72.000</div></div>
-                                            <div class="kv-sep"></div>
-                                            <div class="kv-row"><div class="kv-label">VLAN</div><div class="kv-value">3021</div></div>
-                                            <div class="kv-sep"></div>
-                                            <div class="kv-row"><div class="kv-label">GPON</div><div class="kv-value">2.5G/1.25G</div></div>
-                                        </div>
-                                    </div>
-                                </div>
-                            </details>
-                        </div>
-                        """,
-                        unsafe_allow_html=True,
-                    )
-                elif current == "Tags":
-                    # Fetch tags for this specific client
-                    all_tags_df = fetch_client_tags_dataframe()
-                    
+                    # Plain HTML, so skip the markdown parser
+                    st.html(_render_ont_card(ont_id))
+            
+                # Grid selections rerun only this fragment; adding or removing tags still reruns
+                # the whole app (st.rerun() defaults to app scope), so the card's tag badges stay in sync
+                @st.fragment
+                def client_tags_subtab():
+                    # Fetch tags for this specific client only
+                    client_tags_df = fetch_client_tags_dataframe(client_id=client_id)
+            
                     # Placeholder for messages (used by both empty and non-empty states)
                     message_container = st.container()
-                    
-                    if all_tags_df.empty:
-                        st.info("No tags found in the database.")
-                        client_tags_df = pd.DataFrame()  # Empty dataframe for consistency
+            
+                    if client_tags_df.empty:
+                        st.info("No tags assigned to this client.")
                     else:
-                        # Filter for current client only
-                        client_tags_df = all_tags_df[all_tags_df['client_id'] == client_id].copy()
-                        
-                        if client_tags_df.empty:
-                            st.info("No tags assigned to this client.")
+                        # Grid content only shows when there are tags
+                        # Reuse the view and grid options while this client's tags are unchanged, e.g. when
+                        # only the selection changed. AgGrid stores the serialized rows in the options as rowData.
+                        grid_data_hash = hash(pd.util.hash_pandas_object(client_tags_df, index=False).values.tobytes())
+                        cached_grid = st.session_state.get("client_tags_grid_options")
+                        if cached_grid is not None and cached_grid[0] == grid_data_hash:
+                            _, df_view, grid_options = cached_grid
                         else:
-                            # Grid content only shows when there are tags
-                            # Select columns to display, keep tag_id for deletion
+                            # Select only the rendered columns; client_tags_df keeps tag_id for deletion
                             columns_to_show = ['display_name', 'tag_type', 'assigned_at', 'assigned_by', 'reason']
                             df_view = client_tags_df[[col for col in columns_to_show if col in client_tags_df.columns]].copy()
-                            
+                
                             # Add a selection column at the beginning
                             df_view.insert(0, "Select", "")
-                            
+                
                             # Map tag_type from codes to full names
                             if "tag_type" in df_view.columns:
-                                tag_type_mapping = {"A": "Automatic", "M": "Manual"}
-                                df_view["tag_type"] = df_view["tag_type"].map(tag_type_mapping).fillna(df_view["tag_type"])
-                            
+                                df_view["tag_type"] = df_view["tag_type"].cat.rename_categories(TAG_TYPE_LABELS)
+                
+                            # Precompute the badge colors per row, so the renderer does no color math
+                            if "display_name" in df_view.columns and "color" in client_tags_df.columns:
+                                df_view["_bg"] = client_tags_df["color"]
+                                df_view["_fg"] = get_contrast_colors(df_view["_bg"])
+                
                             # Build AG Grid
                             gb = GridOptionsBuilder.from_dataframe(df_view, enableRowGroup=False, enableValue=False, enablePivot=False)
-                            
+                
                             # Configure selection - disable row click selection
                             gb.configure_selection(
                                 selection_mode="multiple",
                                 use_checkbox=False,
                                 rowMultiSelectWithClick=False,
                             )
-                            
+                
                             # Configure grid options to prevent row click selection
                             gb.configure_grid_options(
                                 suppressRowClickSelection=True,
                                 rowSelection='multiple'
                             )
-                            
+                
                             # Configure the Select column with checkboxes
                             gb.configure_column(
                                 "Select",
@@ -2002,7 +2228,7 @@ elif st.session_state.active_tab == "Client":
                                 width=50,
                                 maxWidth=50,
                             )
-                            
+                
                             # Configure default column settings
                             gb.configure_default_column(
                                 editable=False,
@@ -2013,7 +2239,7 @@ elif st.session_state.active_tab == "Client":
                                 menuTabs=[],
                                 suppressHeaderMenuButton=True,
                             )
-                            
+                
                             # Configure column headers
                             column_headers = {
                                 "display_name": "Tag",
@@ -2022,7 +2248,7 @@ elif st.session_state.active_tab == "Client":
                                 "assigned_by": "Assigned By",
                                 "reason": "Reason",
                             }
-                            
+                
                             for col, header in column_headers.items():
                                 if col in df_view.columns:
                                     gb.configure_column(
@@ -2033,60 +2259,19 @@ elif st.session_state.active_tab == "Client":
                                         menuTabs=[],
                                         suppressHeaderMenuButton=True,
                                     )
-                            
+                
                             # Configure display_name column with badge rendering
                             if "display_name" in df_view.columns:
-                                # Store color mapping for the renderer
-                                color_map = {}
-                                if "display_name" in client_tags_df.columns and "color" in client_tags_df.columns:
-                                    for _, row in client_tags_df.iterrows():
-                                        if pd.notna(row.get("display_name")) and pd.notna(row.get("color")):
-                                            color_map[str(row["display_name"])] = str(row["color"])
-                                
-                                # Create color lookup string for JS using proper JSON encoding
-                                import json
-                                color_json = json.dumps(color_map)
-                                
-                                color_renderer = JsCode(f"""
-                                    class ColorBadgeRenderer {{
-                                        init(params) {{
-                                            const colorMap = {color_json};
-                                            const displayName = params.data.display_name || '';
-                                            const color = colorMap[displayName] || '#6b7280';
-                                            
-                                            function getContrastColor(hexColor) {{
-                                                const hex = hexColor.replace('#', '');
-                                                const r = parseInt(hex.substr(0, 2), 16);
-                                                const g = parseInt(hex.substr(2, 2), 16);
-                                                const b = parseInt(hex.substr(4, 2), 16);
-                                                const luminance = (0.299 * r + 0.587 * g + 0.114 * b) / 255;
-                                                return luminance > 0.5 ? '#000000' : '#ffffff';
-                                            }}
-                                            
-                                            const textColor = getContrastColor(color);
-                                            
-                                            this.eGui = document.createElement('span');
-                                            this.eGui.style.display = 'inline-block';
-                                            this.eGui.style.padding = '2px 8px';
-                                            this.eGui.style.borderRadius = '9999px';
-                                            this.eGui.style.backgroundColor = color;
-                                            this.eGui.style.color = textColor;
-                                            this.eGui.style.fontWeight = '600';
-                                            this.eGui.style.fontSize = '13px';
-                                            this.eGui.style.lineHeight = '1.3';
-                                            this.eGui.textContent = displayName;
-                                        }}
-                                        getGui() {{ return this.eGui; }}
-                                    }}
-                                """)
-                                gb.configure_column("display_name", headerName="Tag", cellRenderer=color_renderer)
-                            
+                                gb.configure_column("display_name", headerName="Tag", cellRenderer=TAG_BADGE_RENDERER)
+                                gb.configure_column("_bg", hide=True)
+                                gb.configure_column("_fg", hide=True)
+                
                             # No pagination - show all rows
                             gb.configure_pagination(enabled=False)
-                            
+                
                             # Build grid options BEFORE displaying
                             grid_options = gb.build()
-                            
+                
                             # Post-build: force suppressMenu on all columns
                             if 'columnDefs' in grid_options:
                                 for col_def in grid_options['columnDefs']:
@@ -2094,68 +2279,68 @@ elif st.session_state.active_tab == "Client":
                                     col_def['suppressHeaderMenuButton'] = True
                                     col_def['menuTabs'] = []
                                     col_def['filter'] = False
-                            
-                            # Calculate dynamic height based on row count (header + rows + padding)
-                            row_height = 42  # approximate height per row
-                            header_height = 48  # header height
-                            min_height = 150  # minimum height
-                            dynamic_height = header_height + (len(df_view) * row_height) + 10
-                            grid_height = max(min_height, min(dynamic_height, 800))  # cap at 800px
-                            
-                            # Initialize deletion counter for grid key management
-                            if 'client_detail_deletion_count' not in st.session_state:
-                                st.session_state.client_detail_deletion_count = 0
-                            
-                            # Display the grid with dynamic key that changes after deletions
-                            grid_key = f'client_tags_grid_{st.session_state.client_detail_deletion_count}'
-                            grid_response = AgGrid(
-                                df_view,
-                                gridOptions=grid_options,
-                                height=grid_height,
-                                fit_columns_on_grid_load=False,
-                                update_mode=GridUpdateMode.SELECTION_CHANGED,
-                                data_return_mode=DataReturnMode.AS_INPUT,
-                                allow_unsafe_jscode=True,
-                                theme="balham",
-                                key=grid_key,
-                            )
-                            
-                            # Show remove button if rows are selected (below the grid)
-                            selected_rows = grid_response.get("selected_rows", [])
-                            if selected_rows is not None and len(selected_rows) > 0:
-                                selected_count = len(selected_rows)
-                                if st.button(f"🗑️ Remove Selected ({selected_count})", key="remove_client_tags_button", type="primary"):
-                                    removed_count = 0
-                                    
-                                    # Convert selected_rows to DataFrame if it's not already
-                                    if isinstance(selected_rows, pd.DataFrame):
-                                        selected_df = selected_rows
-                                    else:
-                                        selected_df = pd.DataFrame(selected_rows)
-                                    
-                                    for idx, selected_row in selected_df.iterrows():
-                                        # Get tag info from selected row
-                                        display_name = selected_row.get("display_name")
-                                        
-                                        if display_name:
-                                            # Find tag_id from original client_tags_df
-                                            matching_rows = client_tags_df[client_tags_df["display_name"] == display_name]
-                                            if not matching_rows.empty:
-                                                tag_id = matching_rows.iloc[0]["tag_id"]
-                                                if remove_client_tag(client_id, tag_id):
-                                                    removed_count += 1
-                                    
-                                    if removed_count > 0:
-                                        # Increment deletion counter to reset grid selection
-                                        st.session_state.client_detail_deletion_count += 1
-                                        with message_container:
-                                            st.success(f"Successfully removed {removed_count} tag(s).")
-                                        st.rerun()
-                    
+                
+                            st.session_state["client_tags_grid_options"] = (grid_data_hash, df_view, grid_options)
+                
+                        # Calculate dynamic height based on row count (header + rows + padding)
+                        row_height = 42  # approximate height per row
+                        header_height = 48  # header height
+                        min_height = 150  # minimum height
+                        dynamic_height = header_height + (len(df_view) * row_height) + 10
+                        grid_height = max(min_height, min(dynamic_height, 800))  # cap at 800px
+                
+                        # Initialize deletion counter for grid key management
+                        if 'client_detail_deletion_count' not in st.session_state:
+                            st.session_state.client_detail_deletion_count = 0
+                
+                        # Display the grid with dynamic key that changes after deletions
+                        grid_key = f'client_tags_grid_{st.session_state.client_detail_deletion_count}'
+                        grid_response = AgGrid(
+                            df_view,
+                            gridOptions=grid_options,
+                            height=grid_height,
+                            fit_columns_on_grid_load=False,
+                            update_mode=GridUpdateMode.SELECTION_CHANGED,
+                            data_return_mode=DataReturnMode.AS_INPUT,
+                            allow_unsafe_jscode=True,
+                            theme="balham",
+                            key=grid_key,
+                        )
+                
+                        # Show remove button if rows are selected (below the grid)
+                        selected_rows = grid_response.get("selected_rows", [])
+                        if selected_rows is not None and len(selected_rows) > 0:
+                            selected_count = len(selected_rows)
+                            if st.button(f"🗑️ Remove Selected ({selected_count})", key="remove_client_tags_button", type="primary"):
+                                removed_count = 0
+                        
+                                # Convert selected_rows to DataFrame if it's not already
+                                if isinstance(selected_rows, pd.DataFrame):
+                                    selected_df = selected_rows
+                                else:
+                                    selected_df = pd.DataFrame(selected_rows)
+                        
+                                # Join the selection to tag_id on the original client_tags_df in one go, first match wins
+                                tag_keys = client_tags_df[["display_name", "tag_id"]].drop_duplicates("display_name")
+                                selected_keys = selected_df.loc[selected_df["display_name"].fillna("") != "", ["display_name"]]
+                                matched = selected_keys.merge(tag_keys, on="display_name")
+                                rows_to_remove = matched.assign(client_id=client_id)[["client_id", "tag_id"]].to_dict("records")
+                        
+                                # One transaction for the whole selection
+                                if remove_client_tags_bulk(rows_to_remove):
+                                    removed_count = len(rows_to_remove)
+                        
+                                if removed_count > 0:
+                                    # Increment deletion counter to reset grid selection
+                                    st.session_state.client_detail_deletion_count += 1
+                                    with message_container:
+                                        st.success(f"Successfully removed {removed_count} tag(s).")
+                                    st.rerun()
+        
                     # Add Tag button that opens a dialog (always show, even if no tags)
                     if st.button("➕ Add Tag", key="open_add_tag_dialog"):
                         st.session_state.show_add_tag_dialog = True
-                    
+            
                     # Add Tag Dialog (always available)
                     if st.session_state.get("show_add_tag_dialog", False):
                         @st.dialog("Add Tag")
@@ -2163,10 +2348,13 @@ elif st.session_state.active_tab == "Client":
                                     manual_tags_df = fetch_tag_config(tag_type='M')
                                     if not manual_tags_df.empty:
                                         # Filter out already assigned tags
-                                        assigned_tag_ids = client_tags_df['tag_id'].tolist() if not client_tags_df.empty else []
+                                        assigned_tag_ids = set(client_tags_df['tag_id']) if not client_tags_df.empty else set()
                                         available_tags = manual_tags_df[~manual_tags_df['id'].isin(assigned_tag_ids)]
-                                        
+                                
                                         if not available_tags.empty:
+                                            # Tag id by name, keeping the first tag for duplicate names
+                                            unique_tags = available_tags.drop_duplicates('display_name')
+                                            tag_id_by_name = dict(zip(unique_tags['display_name'], unique_tags['id']))
                                             tag_options = ["Select a tag..."] + available_tags['display_name'].tolist()
                                             selected_tag = st.selectbox(
                                                 "Tag",
@@ -2174,13 +2362,13 @@ elif st.session_state.active_tab == "Client":
                                                 index=0,
                                                 key="dialog_tag_selector"
                                             )
-                                            
+                                    
                                             reason_input = st.text_input(
                                                 "Reason (optional)",
                                                 key="dialog_reason_input",
                                                 placeholder="Enter reason for adding this tag..."
                                             )
-                                            
+                                    
                                             # Buttons in two columns
                                             col1, col2 = st.columns(2)
                                             add_clicked = False
@@ -2191,10 +2379,10 @@ elif st.session_state.active_tab == "Client":
                                                 if st.button("Cancel", key="cancel_add_tag", use_container_width=True):
                                                     st.session_state.show_add_tag_dialog = False
                                                     st.rerun()
-                                            
+                                    
                                             # Handle add action outside columns
                                             if add_clicked:
-                                                tag_id = available_tags[available_tags['display_name'] == selected_tag]['id'].values[0]
+                                                tag_id = tag_id_by_name[selected_tag]
                                                 if add_client_tag(client_id, tag_id, ont_id="7701234567", assigned_by="Dahi Nemutlu", reason=reason_input):
                                                     st.session_state.show_add_tag_dialog = False
                                                     st.success(f"Added tag: {selected_tag}")
@@ -2210,24 +2398,18 @@ elif st.session_state.active_tab == "Client":
                                         if st.button("Close", key="close_no_manual_tags"):
                                             st.session_state.show_add_tag_dialog = False
                                             st.rerun()
-                        
+                
                         add_tag_dialog()
-                elif current == "Assign":
-                    st.write("")
-                elif current == "SIP":
-                    st.write("")
-                elif current == "Client Operations":
-                    st.write("")
-                elif current == "Client Attachments":
-                    st.write("")
-                elif current == "Client Attachments KYC":
-                    st.write("")
-                elif current == "Dicigare Tickets":
-                    st.write("")
-                elif current == "Call Tickets":
-                    st.write("")
-        
-        st.markdown('</div>', unsafe_allow_html=True)
+            
+                # One dict lookup picks the active subtab instead of a chain of string comparisons
+                # Subtabs without content yet have no entry, so they render nothing rather than an empty element
+                subtab_renderers = {
+                    "CPEs": cpes_subtab,
+                    "Tags": client_tags_subtab,
+                }
+                render_subtab = subtab_renderers.get(current)
+                if render_subtab is not None:
+                    render_subtab()
 else:
     st.title("Welcome to Tailored Offers")
-    st.write("This is a prototype application.")
+    st.html(SPLASH_HTML)